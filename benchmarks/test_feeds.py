@@ -0,0 +1,32 @@
+"""Замеры лент в стиле pytest-benchmark.
+
+Запуск: pytest benchmarks/ (нужен пакет pytest-benchmark).
+"""
+import random
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from posts import benchmark as feeds  # noqa: E402
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def transport():
+    feeds.seed(users=50, groups=5, posts=500, comments=1000, follows=500)
+    transport = feeds.ClientTransport(feeds.benchmark_user())
+    yield transport
+    transport.close()
+
+
+@pytest.mark.parametrize('scenario', feeds.SCENARIOS)
+def test_feed(benchmark, transport, scenario):
+    build = feeds.scenario_requests(random.Random(0))
+
+    def request():
+        return transport.request(*build(scenario))
+
+    status, _ = benchmark(request)
+    assert status < 400
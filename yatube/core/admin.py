@@ -0,0 +1,13 @@
+from django.contrib import admin
+
+from .models import QueuedTask
+
+
+class QueuedTaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status',)
+    search_fields = ('name',)
+    readonly_fields = ('created',)
+
+
+admin.site.register(QueuedTask, QueuedTaskAdmin)
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import db
+
+        # после close_old_connections Django, который подключён раньше
+        connection_created.connect(db.connection_created)
+        request_started.connect(db.check_connections)
+        request_finished.connect(db.release_connections)
@@ -0,0 +1,200 @@
+"""Настройка кеша из окружения и двухуровневый кеш.
+
+Общий кеш задаётся переменной CACHE_URL:
+
+    locmem://                       — локальная память процесса (по умолчанию)
+    file:///var/tmp/yatube_cache    — файлы на диске
+    db://cache_table                — таблица БД (manage.py createcachetable)
+    memcached://host:11211,host2:11211
+    redis://host:6379/0             — Redis или совместимый сервер
+                                      (нужен пакет django-redis)
+
+Перед общим кешем ставится локальный кеш процесса (L1) с коротким временем
+жизни, чтобы горячие ключи не ходили по сети на каждом запросе. Ключи,
+устаревание которых другие процессы должны видеть сразу (поколения лент,
+подписки), читаются только из общего кеша.
+"""
+from urllib.parse import parse_qsl, urlsplit
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+SHARED_CACHE_ALIAS = 'shared'
+
+_MISSING = object()
+
+
+def parse_cache_url(url, max_connections=None):
+    """Возвращает описание кеша для settings.CACHES по URL."""
+    parts = urlsplit(url)
+    options = dict(parse_qsl(parts.query))
+    if parts.scheme == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': parts.netloc,
+        }
+    if parts.scheme == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': parts.path,
+        }
+    if parts.scheme == 'db':
+        return {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': parts.netloc or parts.path.lstrip('/'),
+        }
+    if parts.scheme == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': parts.netloc.split(','),
+        }
+    if parts.scheme in ('redis', 'rediss'):
+        pool = {}
+        if max_connections:
+            pool['max_connections'] = int(max_connections)
+        return {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': parts._replace(query='').geturl(),
+            'OPTIONS': {**options, 'CONNECTION_POOL_KWARGS': pool},
+        }
+    raise ImproperlyConfigured(f'Неизвестная схема кеша: {url}')
+
+
+def cache_settings(url, local_timeout=0, max_connections=None,
+                   shared_only=()):
+    """Собирает settings.CACHES: общий кеш и, если нужно, L1 перед ним.
+
+    Ключи с префиксами из ``shared_only`` в L1 не попадают.
+    """
+    shared = parse_cache_url(url, max_connections)
+    if not local_timeout or shared['BACKEND'].endswith('LocMemCache'):
+        return {'default': shared}
+    return {
+        'default': {
+            'BACKEND': 'core.cache.TwoLevelCache',
+            'LOCATION': SHARED_CACHE_ALIAS,
+            'OPTIONS': {
+                'LOCAL_TIMEOUT': local_timeout,
+                'SHARED_ONLY_PREFIXES': tuple(shared_only),
+            },
+        },
+        SHARED_CACHE_ALIAS: shared,
+    }
+
+
+class TwoLevelCache(BaseCache):
+    """Локальный кеш процесса перед общим кешем.
+
+    Запись идёт в оба уровня, чтение — сначала из локального. Значение
+    в L1 живёт не дольше LOCAL_TIMEOUT секунд, это и есть предел того,
+    насколько другой процесс может отстать от общего кеша. Ключи
+    с префиксами из SHARED_ONLY_PREFIXES всегда читаются из общего кеша.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.local_timeout = int(options.get('LOCAL_TIMEOUT', 5))
+        self.shared_only = tuple(options.get('SHARED_ONLY_PREFIXES', ()))
+        self._shared_alias = location
+        self._local = LocMemCache(f'two-level-{location}', {
+            'TIMEOUT': self.local_timeout,
+            'OPTIONS': {
+                'MAX_ENTRIES': options.get('LOCAL_MAX_ENTRIES', 1000),
+            },
+        })
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _is_local(self, key):
+        return not key.startswith(self.shared_only)
+
+    def _local_data(self, data):
+        return {
+            key: value for key, value in data.items() if self._is_local(key)
+        }
+
+    def _local_timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT or timeout is None:
+            return self.local_timeout
+        return min(timeout, self.local_timeout)
+
+    def get(self, key, default=None, version=None):
+        if not self._is_local(key):
+            return self.shared.get(key, default, version=version)
+        value = self._local.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._local.set(key, value, version=version)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = self._local.get_many(
+            [key for key in keys if self._is_local(key)], version=version
+        )
+        missing = [key for key in keys if key not in found]
+        if missing:
+            shared = self.shared.get_many(missing, version=version)
+            self._local.set_many(self._local_data(shared), version=version)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout, version=version)
+        if self._is_local(key):
+            self._local.set(
+                key, value, self._local_timeout(timeout), version=version
+            )
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout, version=version)
+        self._local.set_many(
+            self._local_data(data), self._local_timeout(timeout),
+            version=version
+        )
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout, version=version)
+        if added and self._is_local(key):
+            self._local.set(
+                key, value, self._local_timeout(timeout), version=version
+            )
+        else:
+            self._local.delete(key, version=version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local.delete(key, version=version)
+        return self.shared.incr(key, delta, version=version)
+
+    def delete(self, key, version=None):
+        self._local.delete(key, version=version)
+        self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        self._local.delete_many(keys, version=version)
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        return (
+            self._local.has_key(key, version=version)
+            or self.shared.has_key(key, version=version)
+        )
+
+    def clear(self):
+        self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,91 @@
+"""Постоянные соединения с базой данных.
+
+Соединение потока живёт DB_CONN_MAX_AGE секунд и переиспользуется
+следующими запросами. Перед запросом соединение, простоявшее дольше
+DB_HEALTH_CHECK_INTERVAL секунд, проверяется и при обрыве закрывается,
+чтобы Django открыл новое. Держать соединения открытыми между запросами
+могут не больше DB_MAX_PERSISTENT_CONNECTIONS потоков процесса, остальные
+закрывают их после ответа. Счётчики отдаёт core:connections.
+"""
+import threading
+from collections import Counter, defaultdict
+from time import monotonic
+
+from django.conf import settings
+from django.db import connections
+
+_lock = threading.Lock()
+_stats = Counter()
+# потоки, которые держат открытые соединения, по базам
+_holders = defaultdict(set)
+
+
+def connection_created(sender, connection, **kwargs):
+    with _lock:
+        _stats['opened'] += 1
+
+
+def check_connections(**kwargs):
+    """Проверяет соединения, простоявшие без дела, перед запросом."""
+    now = monotonic()
+    for connection in connections.all():
+        if connection.connection is None:
+            continue
+        with _lock:
+            _stats['reused'] += 1
+        last_used = getattr(connection, 'last_used', now)
+        if now - last_used < settings.DB_HEALTH_CHECK_INTERVAL:
+            continue
+        if not connection.is_usable():
+            connection.close()
+            with _lock:
+                _stats['closed_unusable'] += 1
+
+
+def _keep_persistent(holders, thread):
+    """Оставляет потоку соединение, если лимит процесса не исчерпан."""
+    if thread in holders:
+        return True
+    if len(holders) >= settings.DB_MAX_PERSISTENT_CONNECTIONS:
+        # завершившиеся потоки соединений уже не держат
+        holders.intersection_update(
+            item.ident for item in threading.enumerate()
+        )
+    if len(holders) < settings.DB_MAX_PERSISTENT_CONNECTIONS:
+        holders.add(thread)
+        return True
+    return False
+
+
+def release_connections(**kwargs):
+    """Отмечает время использования и ограничивает число соединений."""
+    thread = threading.get_ident()
+    now = monotonic()
+    for connection in connections.all():
+        holders = _holders[connection.alias]
+        with _lock:
+            if connection.connection is None:
+                holders.discard(thread)
+                continue
+            keep = _keep_persistent(holders, thread)
+            if not keep:
+                _stats['closed_over_limit'] += 1
+        connection.last_used = now
+        if not keep:
+            connection.close()
+
+
+def snapshot():
+    with _lock:
+        stats = dict(_stats)
+        stats['persistent'] = {
+            alias: len(holders) for alias, holders in _holders.items()
+        }
+    stats['max_age'] = settings.DATABASES['default']['CONN_MAX_AGE']
+    stats['max_persistent'] = settings.DB_MAX_PERSISTENT_CONNECTIONS
+    return stats
+
+
+def reset_stats():
+    with _lock:
+        _stats.clear()
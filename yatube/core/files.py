@@ -0,0 +1,76 @@
+"""Отдача файлов с диска: проверка пути, условные запросы и Range."""
+import os
+import posixpath
+
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404
+from django.utils._os import safe_join
+from django.views.static import was_modified_since
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def resolve(root, path):
+    """Абсолютный путь и stat файла ``path`` внутри ``root`` или Http404."""
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(root, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    return path, fullpath, os.stat(fullpath)
+
+
+def not_modified(request, stat):
+    """Не изменился ли файл с даты из If-Modified-Since."""
+    return not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        stat.st_mtime,
+        stat.st_size
+    )
+
+
+def parse_range(header, size):
+    """Границы (включительно) единственного диапазона из заголовка Range.
+
+    Возвращает None, если файл нужно отдать целиком: заголовка нет, он
+    некорректен или в нём несколько диапазонов. Если диапазон не
+    пересекается с файлом, бросает RangeNotSatisfiable.
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    ranges = header[len('bytes='):].split(',')
+    if len(ranges) != 1:
+        return None
+    start, _, end = ranges[0].strip().partition('-')
+    try:
+        if not start:
+            # последние ``end`` байт файла
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def file_chunks(file, start, length):
+    """Читает ``length`` байт файла с позиции ``start`` и закрывает его."""
+    with file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(CHUNK_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
@@ -0,0 +1,72 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import tasks
+
+
+def execute_in_thread(queued):
+    try:
+        return tasks.execute(queued)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из базы (TASKS_BACKEND = "db")'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Сколько задач выполнять одновременно'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=20,
+            help='Сколько задач забирать из базы за раз'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=1.0,
+            help='Пауза в секундах, когда задач нет'
+        )
+
+    def handle(self, *args, **options):
+        threads = max(options['threads'], 1)
+        executor = ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix='tasks'
+        )
+        done = failed = 0
+        try:
+            while True:
+                batch = tasks.claim(max(options['batch_size'], threads))
+                if batch:
+                    if threads == 1:
+                        results = map(tasks.execute, batch)
+                    else:
+                        results = executor.map(execute_in_thread, batch)
+                    for result in results:
+                        done += result
+                        failed += not result
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            executor.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        ))
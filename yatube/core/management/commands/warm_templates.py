@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        'Компилирует все шаблоны проекта и сообщает об ошибках разбора '
+        '(проверка перед выкладкой)'
+    )
+
+    def handle(self, *args, **options):
+        compiled, errors = warm_up()
+        for name, error in sorted(errors.items()):
+            self.stderr.write(f'{name}: {error}')
+        if errors:
+            raise CommandError(f'Шаблонов с ошибками: {len(errors)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Скомпилировано шаблонов: {compiled}'
+        ))
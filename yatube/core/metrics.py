@@ -0,0 +1,122 @@
+"""Метрики запросов: число и время SQL, рендер шаблонов, попадания в кеш.
+
+Метрики текущего запроса собирает core.middleware.MetricsMiddleware,
+остальной код только сообщает о событиях (record_cache, TemplateTimer).
+Сводная статистика по представлениям хранится в памяти процесса.
+"""
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: defaultdict(float))
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.render_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def total_time(self):
+        return perf_counter() - self.started
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += perf_counter() - started
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing (длительности в мс)."""
+        return ', '.join((
+            'db;dur={:.1f};desc="{} queries"'.format(
+                self.sql_time * 1000, self.queries
+            ),
+            'tpl;dur={:.1f}'.format(self.render_time * 1000),
+            'cache;desc="{} hits, {} misses"'.format(
+                self.cache_hits, self.cache_misses
+            ),
+            'total;dur={:.1f}'.format(self.total_time * 1000),
+        ))
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def finish():
+    metrics = current()
+    _local.metrics = None
+    return metrics
+
+
+def current():
+    return getattr(_local, 'metrics', None)
+
+
+def record_cache(hits=0, misses=0):
+    metrics = current()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+class TemplateTimer:
+    """Засекает время рендера шаблона верхнего уровня."""
+
+    def __enter__(self):
+        self.metrics = current()
+        if self.metrics is not None:
+            self.metrics.render_depth += 1
+            self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.metrics is None:
+            return
+        self.metrics.render_depth -= 1
+        if not self.metrics.render_depth:
+            self.metrics.render_time += perf_counter() - self.started
+
+
+def add_to_stats(view_name, metrics):
+    with _stats_lock:
+        view_stats = _stats[view_name]
+        total_time = metrics.total_time
+        view_stats['requests'] += 1
+        view_stats['total_time'] += total_time
+        view_stats['max_time'] = max(view_stats['max_time'], total_time)
+        view_stats['queries'] += metrics.queries
+        view_stats['max_queries'] = max(
+            view_stats['max_queries'], metrics.queries
+        )
+        view_stats['sql_time'] += metrics.sql_time
+        view_stats['render_time'] += metrics.render_time
+        view_stats['cache_hits'] += metrics.cache_hits
+        view_stats['cache_misses'] += metrics.cache_misses
+
+
+def snapshot():
+    """Сводка по представлениям со средними значениями на запрос."""
+    with _stats_lock:
+        stats = {name: dict(values) for name, values in _stats.items()}
+    for values in stats.values():
+        requests = values['requests']
+        for field in ('total_time', 'queries', 'sql_time', 'render_time'):
+            values[f'avg_{field}'] = values[field] / requests
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
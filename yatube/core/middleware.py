@@ -0,0 +1,86 @@
+import logging
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import metrics, routers
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class MetricsMiddleware:
+    """Считает SQL-запросы, время рендера и кеш для каждого запроса.
+
+    Итог отдаётся клиенту в заголовке Server-Timing и копится в сводной
+    статистике по представлениям (core:stats). Превышение бюджета
+    запросов из QUERY_BUDGETS пишется в лог, а с QUERY_BUDGETS_STRICT
+    бросает QueryBudgetExceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        request_metrics.execute_wrapper
+                    ))
+                response = self.get_response(request)
+        finally:
+            metrics.finish()
+        response['Server-Timing'] = request_metrics.server_timing()
+        match = getattr(request, 'resolver_match', None)
+        if match is not None:
+            metrics.add_to_stats(match.view_name, request_metrics)
+            self.check_budget(match.view_name, request_metrics)
+        return response
+
+    def check_budget(self, view_name, request_metrics):
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or request_metrics.queries <= budget:
+            return
+        message = 'Представление %s выполнило %s SQL-запросов при бюджете %s'
+        if settings.QUERY_BUDGETS_STRICT:
+            raise QueryBudgetExceeded(
+                message % (view_name, request_metrics.queries, budget)
+            )
+        logger.warning(message, view_name, request_metrics.queries, budget)
+
+
+class ReplicaMiddleware:
+    """Направляет чтения лент и страниц постов на реплики (см. routers)."""
+
+    SAFE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.set_replica_reads(False)
+        if (request.method not in self.SAFE_METHODS
+                and response.status_code < 400):
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        routers.set_replica_reads(
+            request.method in self.SAFE_METHODS
+            and settings.REPLICA_PIN_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+        )
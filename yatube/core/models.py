@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedTask(models.Model):
+    """Задача в очереди TASKS_BACKEND = 'db' (см. core.tasks)."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Не выполнена'),
+    )
+
+    name = models.CharField(max_length=255, verbose_name='Задача')
+    arguments = models.TextField(verbose_name='Аргументы (JSON)')
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Состояние'
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Неудачных попыток'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить не раньше'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята воркером'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата создания'
+    )
+
+    class Meta:
+        ordering = ('pk',)
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'),
+                name='queued_task_status_run_at_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.name
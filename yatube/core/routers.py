@@ -0,0 +1,52 @@
+"""Чтение с реплик базы данных.
+
+Реплики перечислены в DATABASE_REPLICAS. Читать с них разрешает только
+ReplicaMiddleware — для GET-запросов к представлениям из REPLICA_VIEWS,
+поэтому команды, фоновые задачи и запросы на запись работают с основной
+базой. После запроса на запись браузер получает cookie, и его чтения
+REPLICA_PIN_SECONDS секунд идут в основную базу: автор сразу видит свой
+пост или комментарий, даже если реплика отстаёт.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+_local = threading.local()
+
+
+def set_replica_reads(enabled):
+    """Разрешает или запрещает чтение с реплик в текущем потоке."""
+    _local.enabled = enabled
+
+
+def replicas_enabled():
+    """Читает ли текущий поток с реплик."""
+    return bool(settings.DATABASE_REPLICAS) and getattr(
+        _local, 'enabled', False
+    )
+
+
+@contextmanager
+def replica_reads():
+    previous = getattr(_local, 'enabled', False)
+    set_replica_reads(True)
+    try:
+        yield
+    finally:
+        set_replica_reads(previous)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not replicas_enabled():
+            return None
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # на репликах те же данные, что и в основной базе
+        return True
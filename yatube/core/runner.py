@@ -0,0 +1,16 @@
+"""Запуск тестов Django со строгими бюджетами SQL-запросов."""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Превышение QUERY_BUDGETS в тестах роняет запрос."""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budgets_strict = settings.QUERY_BUDGETS_STRICT
+        settings.QUERY_BUDGETS_STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        settings.QUERY_BUDGETS_STRICT = self._budgets_strict
+        super().teardown_test_environment(**kwargs)
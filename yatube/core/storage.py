@@ -0,0 +1,67 @@
+"""Хранилище статики с хешами в именах и заранее сжатыми копиями.
+
+collectstatic записывает каждый файл под именем с хешем содержимого
+(css/site.55e7cbb9ba48.css) и рядом — сжатые копии .gz и, если
+установлен пакет Brotli, .br. Такие файлы не меняются, поэтому
+core.views.static_file отдаёт их с кешированием на год, выбирая копию
+по Accept-Encoding.
+"""
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.functional import cached_property
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Форматы, которые заметно сжимаются (картинки и шрифты уже сжаты)
+COMPRESSIBLE = (
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.txt', '.xml', '.html',
+)
+# Сжатая копия пишется, только если она меньше исходного файла хотя бы
+# на столько процентов
+MIN_SAVING = 5
+
+
+def compressors():
+    yield '.gz', lambda data: gzip.compress(data, 9, mtime=0)
+    if brotli is not None:
+        yield '.br', lambda data: brotli.compress(data)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # файл не собран collectstatic (разработка, тесты)
+            return name
+
+    @cached_property
+    def hashed_names(self):
+        """Имена файлов с хешем: проверка имени без перебора манифеста."""
+        return frozenset(self.hashed_files.values())
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        self.__dict__.pop('hashed_names', None)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE:
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        for suffix, compress in compressors():
+            compressed = compress(data)
+            if len(compressed) * 100 > len(data) * (100 - MIN_SAVING):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
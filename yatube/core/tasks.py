@@ -0,0 +1,201 @@
+"""Фоновые задачи.
+
+Задача — функция модуля, отмеченная декоратором task; её аргументы должны
+сериализоваться в JSON. ``func.delay(*args)`` ставит задачу в очередь,
+способ выполнения задаёт TASKS_BACKEND:
+
+- ``sync`` — сразу, в вызывающем потоке (разработка и тесты);
+- ``thread`` — после коммита транзакции в пуле из TASKS_WORKERS потоков
+  того же процесса;
+- ``db`` — записью QueuedTask в той же транзакции; задачи выполняет
+  команда run_tasks, в том числе в другом процессе.
+
+Упавшая задача повторяется до TASKS_RETRIES раз с паузой
+TASKS_RETRY_DELAY * 2 ** (номер попытки - 1) секунд.
+"""
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.TASKS_WORKERS, thread_name_prefix='tasks'
+        )
+    return _executor
+
+
+def retry_delay(attempt):
+    return settings.TASKS_RETRY_DELAY * 2 ** (attempt - 1)
+
+
+class Task:
+    def __init__(self, func, retries=None):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.retries = retries
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __repr__(self):
+        return f'<Task {self.name}>'
+
+    @property
+    def max_retries(self):
+        if self.retries is None:
+            return settings.TASKS_RETRIES
+        return self.retries
+
+    def delay(self, *args, **kwargs):
+        """Ставит задачу в очередь."""
+        enqueue(self, args, kwargs)
+
+
+def task(func=None, *, retries=None):
+    """Делает функцию задачей. ``retries`` переопределяет TASKS_RETRIES."""
+    if func is None:
+        return lambda func: Task(func, retries=retries)
+    return Task(func, retries=retries)
+
+
+def get_task(name):
+    task = import_string(name)
+    if not isinstance(task, Task):
+        raise ImportError(f'{name} не является задачей')
+    return task
+
+
+def run_with_retries(task, args, kwargs, sleep=time.sleep):
+    """Выполняет задачу, повторяя её при ошибках. Ошибки не пробрасываются.
+
+    Каждая попытка идёт в своей точке сохранения: ошибка базы откатывает
+    только её и не ломает транзакцию вызывающего (в режиме sync).
+    Возвращает True, если задача в итоге выполнена.
+    """
+    attempt = 0
+    while True:
+        try:
+            with transaction.atomic():
+                task(*args, **kwargs)
+            return True
+        except Exception:
+            attempt += 1
+            if attempt > task.max_retries:
+                logger.exception('Задача %s не выполнена', task.name)
+                return False
+            logger.warning(
+                'Задача %s упала, попытка %s', task.name, attempt,
+                exc_info=True
+            )
+            sleep(retry_delay(attempt))
+
+
+def _run_in_worker(task, args, kwargs):
+    try:
+        run_with_retries(task, args, kwargs)
+    finally:
+        connections.close_all()
+
+
+def enqueue(task, args=(), kwargs=None):
+    kwargs = kwargs or {}
+    backend = settings.TASKS_BACKEND
+    if backend == 'sync':
+        # без пауз между попытками: вызывающий ждёт результата
+        run_with_retries(task, args, kwargs, sleep=lambda seconds: None)
+    elif backend == 'thread':
+        transaction.on_commit(
+            lambda: get_executor().submit(_run_in_worker, task, args, kwargs)
+        )
+    elif backend == 'db':
+        from .models import QueuedTask
+
+        QueuedTask.objects.create(
+            name=task.name,
+            arguments=json.dumps({'args': args, 'kwargs': kwargs}),
+        )
+    else:
+        raise ValueError(f'Неизвестный TASKS_BACKEND: {backend}')
+
+
+def claim(batch_size):
+    """Забирает готовые к выполнению задачи из базы.
+
+    Задачи, которые дольше TASKS_LOCK_TIMEOUT секунд числятся
+    выполняющимися (воркер упал), забираются повторно.
+    """
+    from .models import QueuedTask
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASKS_LOCK_TIMEOUT)
+    candidates = QueuedTask.objects.filter(
+        Q(status=QueuedTask.PENDING, run_at__lte=now)
+        | Q(status=QueuedTask.RUNNING, locked_at__lt=stale)
+    ).order_by('pk').values_list('pk', 'status', 'locked_at')[:batch_size]
+    claimed = []
+    for pk, status, locked_at in candidates:
+        # другой воркер мог забрать задачу раньше
+        updated = QueuedTask.objects.filter(
+            pk=pk, status=status, locked_at=locked_at
+        ).update(status=QueuedTask.RUNNING, locked_at=now)
+        if updated:
+            claimed.append(pk)
+    return list(QueuedTask.objects.filter(pk__in=claimed).order_by('pk'))
+
+
+def execute(queued):
+    """Выполняет задачу из базы: удаляет её или планирует повтор."""
+    from .models import QueuedTask
+
+    try:
+        task = get_task(queued.name)
+    except ImportError as error:
+        # задачу убрали из кода, повторять бессмысленно
+        return _failed(queued, error, retries=0)
+    try:
+        arguments = json.loads(queued.arguments)
+        task(*arguments['args'], **arguments['kwargs'])
+    except Exception as error:
+        return _failed(queued, error, retries=task.max_retries)
+    QueuedTask.objects.filter(pk=queued.pk).delete()
+    return True
+
+
+def _failed(queued, error, retries):
+    from .models import QueuedTask
+
+    queued.attempts += 1
+    queued.last_error = repr(error)
+    queued.locked_at = None
+    if queued.attempts > retries:
+        logger.error(
+            'Задача %s не выполнена', queued.name, exc_info=error
+        )
+        queued.status = QueuedTask.FAILED
+    else:
+        logger.warning(
+            'Задача %s упала, попытка %s', queued.name, queued.attempts,
+            exc_info=error
+        )
+        queued.status = QueuedTask.PENDING
+        queued.run_at = timezone.now() + timedelta(
+            seconds=retry_delay(queued.attempts)
+        )
+    queued.save()
+    return False
@@ -0,0 +1,59 @@
+"""Шаблонный движок Django, который сообщает время загрузки и рендера
+шаблонов в core.metrics, и предварительная компиляция шаблонов.
+"""
+import os
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.template.backends import django as django_backend
+
+from .metrics import TemplateTimer
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        with TemplateTimer():
+            return super().render(context, request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        # без кеша загрузчика шаблон читается и разбирается здесь
+        with TemplateTimer():
+            try:
+                template = self.engine.get_template(template_name)
+            except TemplateDoesNotExist as exc:
+                django_backend.reraise(exc, self)
+        return Template(template, self)
+
+
+def template_names(directory):
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.relpath(os.path.join(root, name), directory)
+            yield path.replace(os.sep, '/')
+
+
+def warm_up():
+    """Компилирует все шаблоны из каталогов DIRS движков Django.
+
+    С cached.Loader скомпилированные шаблоны остаются в памяти, и первые
+    запросы не читают их с диска. Возвращает число шаблонов и словарь
+    ошибок разбора по именам шаблонов.
+    """
+    compiled = 0
+    errors = {}
+    for backend in engines.all():
+        if not isinstance(backend, django_backend.DjangoTemplates):
+            continue
+        for directory in backend.engine.dirs:
+            for name in template_names(directory):
+                try:
+                    backend.engine.get_template(name)
+                except TemplateSyntaxError as exc:
+                    errors[name] = exc
+                else:
+                    compiled += 1
+    return compiled, errors
@@ -0,0 +1,115 @@
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from core.cache import TwoLevelCache, cache_settings, parse_cache_url
+
+# Общий кеш в тестах подменяется локальным: поведение то же, что у Redis
+TWO_LEVEL_CACHES = {
+    'default': {
+        'BACKEND': 'core.cache.TwoLevelCache',
+        'LOCATION': 'shared',
+        'OPTIONS': {
+            'LOCAL_TIMEOUT': 60,
+            'SHARED_ONLY_PREFIXES': ('generation:',),
+        },
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared-stand-in',
+    },
+}
+
+
+class CacheSettingsTests(SimpleTestCase):
+    def test_parse_cache_url(self):
+        """URL кеша превращается в описание бэкенда"""
+        cases = {
+            'locmem://': 'django.core.cache.backends.locmem.LocMemCache',
+            'file:///tmp/cache':
+            'django.core.cache.backends.filebased.FileBasedCache',
+            'db://cache_table':
+            'django.core.cache.backends.db.DatabaseCache',
+            'redis://localhost:6379/0': 'django_redis.cache.RedisCache',
+        }
+        for url, backend in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(parse_cache_url(url)['BACKEND'], backend)
+        with self.assertRaises(ImproperlyConfigured):
+            parse_cache_url('unknown://')
+
+    def test_redis_pool_and_local_level(self):
+        """Для общего кеша настраивается пул соединений и L1"""
+        config = cache_settings(
+            'redis://localhost:6379/0', local_timeout=5, max_connections=20
+        )
+        self.assertEqual(
+            config['default']['BACKEND'], 'core.cache.TwoLevelCache'
+        )
+        self.assertEqual(
+            config['shared']['OPTIONS']['CONNECTION_POOL_KWARGS'],
+            {'max_connections': 20}
+        )
+        self.assertEqual(
+            list(cache_settings('locmem://', local_timeout=5)), ['default']
+        )
+        config = cache_settings(
+            'redis://localhost:6379/0', local_timeout=5,
+            shared_only=['follows:']
+        )
+        self.assertEqual(
+            config['default']['OPTIONS']['SHARED_ONLY_PREFIXES'],
+            ('follows:',)
+        )
+
+
+@override_settings(CACHES=TWO_LEVEL_CACHES)
+class TwoLevelCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def test_writes_reach_shared_cache(self):
+        """Запись видна в общем кеше, то есть другим процессам"""
+        self.assertIsInstance(self.cache, TwoLevelCache)
+        self.cache.set('key', 'value')
+        self.cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(self.shared.get('key'), 'value')
+        self.assertEqual(self.shared.get_many(['a', 'b']), {'a': 1, 'b': 2})
+
+    def test_reads_are_served_locally(self):
+        """Прочитанное из общего кеша значение сохраняется в L1"""
+        self.shared.set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.shared.delete('key')
+        self.assertEqual(self.cache.get('key'), 'value')
+        self.assertEqual(
+            self.cache.get_many(['key', 'missing']), {'key': 'value'}
+        )
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_add_and_incr(self):
+        """add и incr выполняются атомарно на общем кеше"""
+        self.assertTrue(self.cache.add('counter', 1))
+        self.assertFalse(self.cache.add('counter', 5))
+        self.assertEqual(self.cache.incr('counter'), 2)
+        self.assertEqual(self.cache.get('counter'), 2)
+
+    def test_shared_only_keys_skip_local_level(self):
+        """Ключи из SHARED_ONLY_PREFIXES не сохраняются в L1"""
+        self.cache.set('generation:index', 1)
+        self.cache.set_many({'generation:all': 1, 'key': 'value'})
+        self.assertTrue(self.cache.add('generation:group', 1))
+        # другой процесс меняет значения в общем кеше
+        self.shared.set_many(
+            {'generation:index': 2, 'generation:all': 2, 'key': 'new'}
+        )
+        self.shared.set('generation:group', 2)
+        self.assertEqual(self.cache.get('generation:index'), 2)
+        self.assertEqual(self.cache.get('generation:group'), 2)
+        self.assertEqual(
+            self.cache.get_many(['generation:all', 'key']),
+            {'generation:all': 2, 'key': 'value'}
+        )
@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import db
+from posts.models import User
+
+
+class PersistentConnectionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_user(username='admin', is_staff=True)
+
+    def setUp(self):
+        db.reset_stats()
+        db._holders.clear()
+
+    def test_connection_is_reused_between_requests(self):
+        self.client.get(reverse('about:author'))
+        self.client.get(reverse('about:author'))
+        stats = db.snapshot()
+        self.assertGreaterEqual(stats['reused'], 2)
+        self.assertEqual(stats['persistent']['default'], 1)
+
+    @override_settings(DB_MAX_PERSISTENT_CONNECTIONS=0)
+    def test_connections_over_limit_are_closed(self):
+        with mock.patch.object(connection, 'close') as close:
+            self.client.get(reverse('about:author'))
+        close.assert_called_once_with()
+        self.assertEqual(db.snapshot()['closed_over_limit'], 1)
+
+    @override_settings(DB_HEALTH_CHECK_INTERVAL=0)
+    def test_broken_connection_is_closed_before_request(self):
+        """Оборвавшееся соединение закрывается до обработки запроса"""
+        connection.last_used = 0
+        with mock.patch.object(connection, 'is_usable', return_value=False):
+            with mock.patch.object(connection, 'close') as close:
+                db.check_connections()
+        close.assert_called_once_with()
+        self.assertEqual(db.snapshot()['closed_unusable'], 1)
+
+    def test_connections_endpoint(self):
+        response = self.client.get(reverse('core:connections'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('core:connections'))
+        self.assertIn('persistent', response.json())
@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+from posts.models import User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(100))
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaFileTests(TestCase):
+    url = '/media/posts/picture.gif'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for name in ('posts/picture.gif', 'private/report.txt'):
+            path = os.path.join(TEMP_MEDIA_ROOT, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, **headers)
+
+    def test_file_is_served(self):
+        """Файл отдаётся целиком с кешированием и поддержкой Range"""
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/gif')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_range_requests(self):
+        """Запрос части файла получает ответ 206 с этой частью"""
+        cases = (
+            ('bytes=10-19', CONTENT[10:20], 'bytes 10-19/100'),
+            ('bytes=95-', CONTENT[95:], 'bytes 95-99/100'),
+            ('bytes=-5', CONTENT[-5:], 'bytes 95-99/100'),
+            ('bytes=90-200', CONTENT[90:], 'bytes 90-99/100'),
+        )
+        for header, content, content_range in cases:
+            with self.subTest(range=header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(
+                    b''.join(response.streaming_content), content
+                )
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(
+                    int(response['Content-Length']), len(content)
+                )
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        """Диапазон за концом файла — 416, некорректный — весь файл"""
+        response = self.get(HTTP_RANGE='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+        for header in ('bytes=abc', 'bytes=0-1,5-6', 'items=0-1'):
+            with self.subTest(range=header):
+                self.assertEqual(self.get(HTTP_RANGE=header).status_code, 200)
+
+    def test_if_range_with_old_date_returns_whole_file(self):
+        """Если файл изменился после If-Range, отдаётся весь файл"""
+        response = self.get(
+            HTTP_RANGE='bytes=0-9',
+            HTTP_IF_RANGE='Thu, 01 Jan 1970 00:00:00 GMT'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified(self):
+        """На неизменившийся файл отвечается 304"""
+        last_modified = self.get()['Last-Modified']
+        response = self.get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_private_files_are_for_staff_only(self):
+        """Файлы вне открытых каталогов доступны только персоналу"""
+        url = '/media/private/report.txt'
+        self.assertEqual(self.get(url).status_code, 404)
+        staff = User.objects.create_user(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.get(url).status_code, 200)
+
+    def test_files_outside_media_root_are_not_served(self):
+        """Файлы вне MEDIA_ROOT не отдаются"""
+        self.assertEqual(self.get('/media/..%2Fmanage.py').status_code, 404)
+
+    @override_settings(MEDIA_SERVE='accel')
+    def test_accel_redirect(self):
+        """С nginx файл отдаёт веб-сервер по внутреннему адресу"""
+        response = self.get()
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            settings.MEDIA_ACCEL_PREFIX + 'posts/picture.gif'
+        )
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'image/gif')
+
+    @override_settings(MEDIA_SERVE='sendfile')
+    def test_sendfile(self):
+        """С X-Sendfile веб-серверу передаётся путь к файлу"""
+        response = self.get()
+        self.assertEqual(
+            response['X-Sendfile'],
+            os.path.join(TEMP_MEDIA_ROOT, 'posts', 'picture.gif')
+        )
+        self.assertEqual(response.content, b'')
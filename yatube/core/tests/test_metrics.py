@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.middleware import QueryBudgetExceeded
+from posts.models import Post, User
+
+
+class MetricsMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.admin = User.objects.create_user(username='admin', is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset_stats()
+
+    def test_server_timing_header(self):
+        """Ответ содержит число запросов, время SQL и рендера"""
+        response = self.client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for part in ('db;dur=', 'queries', 'tpl;dur=', 'cache;', 'total;'):
+            with self.subTest(part=part):
+                self.assertIn(part, timing)
+        self.assertIn('0 hits, 2 misses', timing)
+        timing = self.client.get(reverse('posts:index'))['Server-Timing']
+        self.assertIn('desc="0 queries"', timing)
+        self.assertIn('1 hits, 0 misses', timing)
+
+    def test_stats_endpoint(self):
+        """Сводная статистика доступна только персоналу"""
+        self.client.get(reverse('posts:index'))
+        response = self.client.get(reverse('core:stats'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.admin)
+        stats = self.client.get(reverse('core:stats')).json()
+        self.assertEqual(stats['posts:index']['requests'], 1)
+        self.assertGreater(stats['posts:index']['queries'], 0)
+
+    @override_settings(QUERY_BUDGETS={'posts:index': 1})
+    def test_strict_budget_overrun_fails(self):
+        """Со строгими бюджетами превышение роняет запрос"""
+        with override_settings(QUERY_BUDGETS_STRICT=False):
+            self.assertEqual(
+                self.client.get(reverse('posts:index')).status_code, 200
+            )
+        cache.clear()
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('posts:index'))
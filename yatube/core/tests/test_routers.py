@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (RequestFactory, TestCase, TransactionTestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from core import routers
+from core.middleware import ReplicaMiddleware
+from posts.caching import bump_feeds, feed_cache_key
+from posts.models import Post, User
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1', 'replica_2'])
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def read_db(self, method, path, cookies=None):
+        """База, из которой представление читало бы посты."""
+        request = getattr(RequestFactory(), method)(path)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(path)
+        used = []
+
+        def get_response(request):
+            middleware.process_view(request, None, (), {})
+            used.append(routers.ReplicaRouter().db_for_read(Post))
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(get_response)
+        response = middleware(request)
+        self.assertFalse(routers.replicas_enabled())
+        return used[0], response
+
+    def test_feeds_read_from_replicas(self):
+        for path in (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            with self.subTest(path=path):
+                self.assertIn(
+                    self.read_db('get', path)[0], settings.DATABASE_REPLICAS
+                )
+
+    def test_other_reads_use_primary(self):
+        self.assertIsNone(self.read_db('get', reverse('posts:post_create'))[0])
+        self.assertIsNone(routers.ReplicaRouter().db_for_read(Post))
+
+    def test_reads_after_write_are_pinned_to_primary(self):
+        """После записи чтения автора идут в основную базу"""
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Комментарий'}
+        )
+        self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+        db, _ = self.read_db(
+            'get',
+            reverse('posts:post_detail', args=[self.post.pk]),
+            {settings.REPLICA_PIN_COOKIE: '1'}
+        )
+        self.assertIsNone(db)
+
+    def test_recent_feed_changes_are_not_cached_from_replicas(self):
+        """Реплика может отставать, свежие ленты с неё не кешируются"""
+        bump_feeds('index')
+        self.assertIsNotNone(feed_cache_key('feed', 'index'))
+        with routers.replica_reads():
+            self.assertIsNone(feed_cache_key('feed', 'index'))
+            with override_settings(REPLICA_PIN_SECONDS=0):
+                self.assertIsNotNone(feed_cache_key('feed', 'index'))
+
+
+REPLICA = 'replica_1'
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaDatabaseTests(TransactionTestCase):
+    """Чтения идут через отдельное соединение с репликой.
+
+    Реплика настроена как в settings для REPLICA_DATABASES: в тестах она
+    зеркалит тестовую базу, поэтому видит закоммиченные данные.
+    """
+
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls):
+        connections.databases[REPLICA] = {
+            **connections['default'].settings_dict,
+            'TEST': {'MIRROR': 'default'},
+        }
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.databases[REPLICA]
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='auth')
+        Post.objects.create(author=user, text='Пост с реплики')
+
+    def get(self, url, **extra):
+        """Ответ и SQL-запросы, выполненные в основной базе и реплике."""
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections[REPLICA]) as replica:
+            response = self.client.get(url, **extra)
+        return response, primary, replica
+
+    def post_queries(self, queries):
+        return [
+            query['sql'] for query in queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+
+    def test_feed_reads_from_replica(self):
+        response, primary, replica = self.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост с реплики')
+        self.assertTrue(self.post_queries(replica))
+        self.assertFalse(self.post_queries(primary))
+
+    def test_pinned_reads_use_primary(self):
+        """С cookie после записи лента читается из основной базы"""
+        self.client.cookies[settings.REPLICA_PIN_COOKIE] = '1'
+        response, primary, replica = self.get(reverse('posts:index'))
+        self.assertContains(response, 'Пост с реплики')
+        self.assertTrue(self.post_queries(primary))
+        self.assertEqual(len(replica), 0)
@@ -0,0 +1,77 @@
+import gzip
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+SOURCE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CSS = b'body { color: #333; }\n' * 50
+
+
+@override_settings(STATICFILES_DIRS=[SOURCE_DIR], STATIC_ROOT=STATIC_ROOT)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'))
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'wb') as file:
+            file.write(CSS)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(SOURCE_DIR, ignore_errors=True)
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        call_command(
+            'collectstatic', interactive=False, verbosity=0, stdout=StringIO()
+        )
+        self.url = staticfiles_storage.url('css/site.css')
+
+    def test_collectstatic_writes_hashed_and_compressed_files(self):
+        """Файлы получают хеш в имени и сжатую копию"""
+        self.assertRegex(self.url, r'^/static/css/site\.[0-9a-f]{12}\.css$')
+        path = os.path.join(STATIC_ROOT, self.url[len('/static/'):])
+        with open(path + '.gz', 'rb') as file:
+            self.assertEqual(gzip.decompress(file.read()), CSS)
+
+    def test_compressed_copy_is_served_by_accept_encoding(self):
+        """Сжатая копия отдаётся клиенту, который её принимает"""
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), CSS
+        )
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), CSS)
+
+    def test_hashed_files_are_cached_for_a_year(self):
+        """Файлы с хешем кешируются на год, без хеша — проверяются"""
+        response = self.client.get(self.url)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn(
+            f'max-age={settings.STATIC_HASHED_MAX_AGE}',
+            response['Cache-Control']
+        )
+        response = self.client.get('/static/css/site.css')
+        self.assertIn('no-cache', response['Cache-Control'])
+        response = self.client.get(
+            '/static/css/site.css',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_files_outside_static_root_are_not_served(self):
+        """Файлы вне STATIC_ROOT не отдаются"""
+        response = self.client.get('/static/..%2Fmanage.py')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import tasks
+from core.models import QueuedTask
+from posts.models import Follow, Post, TimelineEntry, User
+from posts.tasks import prune_timeline
+
+CALLS = []
+
+
+@tasks.task
+def remember(value):
+    CALLS.append(value)
+
+
+@tasks.task(retries=1)
+def fail(value):
+    CALLS.append(value)
+    raise RuntimeError(value)
+
+
+@tasks.task(retries=1)
+def break_transaction(username):
+    CALLS.append(username)
+    User.objects.create(username=username)
+
+
+@override_settings(TASKS_RETRY_DELAY=0)
+class SyncTasksTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_task_runs_immediately(self):
+        """В режиме sync задача выполняется при постановке"""
+        remember.delay('готово')
+        self.assertEqual(CALLS, ['готово'])
+
+    def test_database_error_keeps_caller_transaction(self):
+        """Ошибка базы в задаче не ломает транзакцию вызывающего"""
+        User.objects.create(username='taken')
+        with transaction.atomic():
+            with self.assertLogs('core.tasks', 'ERROR'):
+                break_transaction.delay('taken')
+            self.assertEqual(CALLS, ['taken', 'taken'])
+            User.objects.create(username='after')
+        self.assertTrue(User.objects.filter(username='after').exists())
+
+    def test_failed_task_is_retried(self):
+        """Упавшая задача повторяется, ошибка не доходит до вызывающего"""
+        with self.assertLogs('core.tasks', 'ERROR'):
+            fail.delay('ошибка')
+        self.assertEqual(CALLS, ['ошибка', 'ошибка'])
+
+
+@override_settings(TASKS_BACKEND='db', TASKS_RETRY_DELAY=0)
+class DatabaseTasksTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_task_is_queued_until_worker_runs(self):
+        """Задача ждёт в базе, воркер выполняет и удаляет её"""
+        remember.delay('позже')
+        self.assertEqual(CALLS, [])
+        queued = QueuedTask.objects.get()
+        self.assertEqual(queued.name, 'core.tests.test_tasks.remember')
+        call_command('run_tasks', once=True, stdout=StringIO())
+        self.assertEqual(CALLS, ['позже'])
+        self.assertFalse(QueuedTask.objects.exists())
+
+    def test_failed_task_is_marked_after_retries(self):
+        """После исчерпания повторов задача остаётся с ошибкой"""
+        fail.delay('ошибка')
+        with self.assertLogs('core.tasks', 'WARNING'):
+            call_command('run_tasks', once=True, stdout=StringIO())
+        queued = QueuedTask.objects.get()
+        self.assertEqual(queued.status, QueuedTask.FAILED)
+        self.assertEqual(queued.attempts, 2)
+        self.assertIn('RuntimeError', queued.last_error)
+        self.assertEqual(CALLS, ['ошибка', 'ошибка'])
+
+    def test_task_of_crashed_worker_is_reclaimed(self):
+        """Задачу, давно взятую воркером, забирает другой воркер"""
+        remember.delay('снова')
+        QueuedTask.objects.update(
+            status=QueuedTask.RUNNING,
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(len(tasks.claim(10)), 1)
+        self.assertEqual(tasks.claim(10), [])
+
+    def test_follow_backfill_is_deferred(self):
+        """Лента подписчика заполняется задачей, а не в запросе"""
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        post = Post.objects.create(author=author, text='Пост')
+        QueuedTask.objects.all().delete()
+        Follow.objects.create(user=reader, author=author)
+        self.assertFalse(TimelineEntry.objects.filter(user=reader).exists())
+        call_command('run_tasks', once=True, stdout=StringIO())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=reader, post=post).exists()
+        )
+
+    def test_prune_skips_refollowed_author(self):
+        """Запоздавшая отписка не чистит ленту вернувшегося подписчика"""
+        author = User.objects.create_user(username='author')
+        reader = User.objects.create_user(username='reader')
+        post = Post.objects.create(author=author, text='Пост')
+        Follow.objects.create(user=reader, author=author)
+        call_command('run_tasks', once=True, stdout=StringIO())
+        prune_timeline(reader.pk, author.pk)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=reader, post=post).exists()
+        )
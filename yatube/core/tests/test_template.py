@@ -0,0 +1,27 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from core.template import warm_up
+from posts.benchmark import template_settings
+
+
+class TemplateWarmUpTests(TestCase):
+    @override_settings(TEMPLATES=template_settings(cached=True))
+    def test_warm_up_fills_cached_loader(self):
+        """Все шаблоны проекта компилируются в кеш загрузчика"""
+        compiled, errors = warm_up()
+        self.assertEqual(errors, {})
+        loader = engines.all()[0].engine.template_loaders[0]
+        cached = loader.get_template_cache
+        self.assertIn('base.html', cached)
+        self.assertIn('posts/includes/paginator.html', cached)
+        self.assertEqual(len(cached), compiled)
+
+    def test_command_reports_compiled_templates(self):
+        """Команда компилирует шаблоны без ошибок"""
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+        self.assertIn('Скомпилировано шаблонов', out.getvalue())
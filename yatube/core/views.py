@@ -1,4 +1,22 @@
+import mimetypes
+import os
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseNotModified, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from . import db, files, metrics
+
+# Сжатые копии статики в порядке предпочтения (см. core.storage)
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
 
 
 def page_not_found(request, exception):
@@ -15,3 +33,132 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def stats(request):
+    """Сводная статистика запросов по представлениям этого процесса."""
+    return JsonResponse(metrics.snapshot())
+
+
+@staff_member_required
+def connections(request):
+    """Соединения с базой данных этого процесса."""
+    return JsonResponse(db.snapshot())
+
+
+def accepted_encodings(request):
+    """Кодировки из Accept-Encoding, кроме запрещённых через q=0."""
+    accepted = set()
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, *params = part.strip().split(';')
+        if any(param.strip() in ('q=0', 'q=0.0') for param in params):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+@require_safe
+def static_file(request, path):
+    """Собранная статика со сжатой копией по Accept-Encoding.
+
+    Файлы с хешем содержимого в имени кешируются на STATIC_HASHED_MAX_AGE,
+    остальные браузер проверяет по Last-Modified.
+    """
+    path, fullpath, stat = files.resolve(settings.STATIC_ROOT, path)
+    hashed = path in getattr(staticfiles_storage, 'hashed_names', ())
+    if files.not_modified(request, stat):
+        return HttpResponseNotModified()
+    served, content_encoding = fullpath, None
+    accepted = accepted_encodings(request)
+    for coding, suffix in STATIC_ENCODINGS:
+        if coding in accepted and os.path.isfile(fullpath + suffix):
+            served, content_encoding = fullpath + suffix, coding
+            break
+    content_type, _ = mimetypes.guess_type(fullpath)
+    response = FileResponse(open(served, 'rb'))
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if content_encoding:
+        response['Content-Encoding'] = content_encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if hashed:
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=settings.STATIC_HASHED_MAX_AGE,
+            immutable=True
+        )
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def media_allowed(request, path):
+    """Картинки постов и миниатюры открыты всем, остальное — персоналу."""
+    return path.startswith(settings.MEDIA_PUBLIC_DIRS) or request.user.is_staff
+
+
+@require_safe
+def media_file(request, path):
+    """Загруженный файл из MEDIA_ROOT.
+
+    После проверки доступа файл отдаёт веб-сервер (X-Accel-Redirect для
+    nginx или X-Sendfile), а без него — Django через FileResponse, который
+    WSGI-сервер может передать системным вызовом sendfile. Поддерживаются
+    If-Modified-Since и запросы части файла (Range).
+    """
+    path, fullpath, stat = files.resolve(settings.MEDIA_ROOT, path)
+    if not media_allowed(request, path):
+        raise Http404
+    last_modified = http_date(stat.st_mtime)
+    if files.not_modified(request, stat):
+        response = HttpResponseNotModified()
+        response['Last-Modified'] = last_modified
+        return response
+    content_type, _ = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+    if settings.MEDIA_SERVE == 'accel':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(path)
+        )
+    elif settings.MEDIA_SERVE == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = fullpath
+    else:
+        response = media_file_response(request, fullpath, stat, last_modified)
+        response['Content-Type'] = content_type
+    response['Last-Modified'] = last_modified
+    patch_cache_control(
+        response, public=True, max_age=settings.MEDIA_MAX_AGE
+    )
+    return response
+
+
+def media_file_response(request, fullpath, stat, last_modified):
+    """Файл целиком или запрошенная часть, если она задана в Range."""
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None or if_range == last_modified:
+        try:
+            byte_range = files.parse_range(
+                request.META.get('HTTP_RANGE'), stat.st_size
+            )
+        except files.RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+    if byte_range is None:
+        response = FileResponse(open(fullpath, 'rb'))
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            files.file_chunks(open(fullpath, 'rb'), start, length),
+            status=206
+        )
+        response['Content-Length'] = length
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
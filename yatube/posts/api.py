@@ -0,0 +1,161 @@
+"""JSON API лент и постов, только для чтения.
+
+Ленты отдаются потоком (StreamingHttpResponse) страницами по курсору:
+
+    {"results": [{...}, ...], "next": "<курсор следующей страницы>"}
+
+Параметры: ``cursor`` — значение next предыдущей страницы, ``limit`` —
+размер страницы (не больше API_MAX_PAGE_SIZE), ``fields`` — поля постов
+через запятую. На неизменившиеся данные отвечается 304 (см. conditional).
+"""
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+
+from . import feeds
+from .conditional import conditional_feed, conditional_post
+from .models import Group, Post, User
+from .utils import CURSOR_PARAM, CursorPaginator
+
+FIELDS = {
+    'id': lambda post: post.pk,
+    'text': lambda post: post.text,
+    'pub_date': lambda post: post.pub_date.isoformat(),
+    'author': lambda post: post.author.username,
+    'group': lambda post: post.group and post.group.slug,
+    'image': lambda post: post.image.url if post.image else None,
+    'comments_count': lambda post: post.comments_count,
+}
+
+
+class APIError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def api_view(view_func):
+    """Отвечает на APIError JSON с описанием ошибки."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except APIError as error:
+            return JsonResponse({'detail': str(error)}, status=error.status)
+    return wrapper
+
+
+def requested_fields(request):
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(FIELDS)
+    fields = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = set(fields) - FIELDS.keys()
+    if unknown:
+        raise APIError(
+            'Неизвестные поля: {}'.format(', '.join(sorted(unknown)))
+        )
+    return fields
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.NUM_POSTS_ON_PAGE))
+    except ValueError:
+        raise APIError('limit должен быть числом')
+    return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def serialize(post, fields):
+    return {field: FIELDS[field](post) for field in fields}
+
+
+def stream_feed(request, posts):
+    """Отдаёт страницу ленты после курсора по мере чтения из базы."""
+    fields = requested_fields(request)
+    limit = page_limit(request)
+    decoded = CursorPaginator.decode_cursor(request.GET.get(CURSOR_PARAM))
+    if decoded is not None and decoded[0] == 'n':
+        _, pub_date, pk = decoded
+        posts = posts.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
+    rows = posts.order_by(*CursorPaginator.ordering)[:limit + 1].iterator()
+    # запрос выполняется здесь, с маршрутизацией и метриками представления,
+    # а остальные строки дочитываются из курсора при отдаче ответа
+    post = next(rows, None)
+
+    def content(post):
+        yield '{"results": ['
+        last = None
+        count = 0
+        while post is not None and count < limit:
+            yield (', ' if count else '') + json.dumps(
+                serialize(post, fields), ensure_ascii=False
+            )
+            last, post = post, next(rows, None)
+            count += 1
+        cursor = None
+        if post is not None:
+            cursor = CursorPaginator.encode_cursor('n', last)
+        yield '], "next": {}}}'.format(json.dumps(cursor))
+
+    return StreamingHttpResponse(
+        content(post), content_type='application/json'
+    )
+
+
+@require_safe
+@conditional_feed('index', per_user=False)
+@api_view
+def index(request):
+    return stream_feed(request, feeds.index_posts())
+
+
+@require_safe
+@conditional_feed('group:{slug}', per_user=False)
+@api_view
+def group_posts(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return stream_feed(request, feeds.group_posts(group))
+
+
+@require_safe
+@conditional_feed('profile:{username}', per_user=False)
+@api_view
+def profile(request, username):
+    author = get_object_or_404(User, username=username)
+    return stream_feed(request, feeds.profile_posts(author))
+
+
+def follow_feed(request):
+    if not request.user.is_authenticated:
+        return None
+    return feeds.follow_feed(request.user)
+
+
+@require_safe
+@conditional_feed(follow_feed)
+@api_view
+def follow_index(request):
+    if not request.user.is_authenticated:
+        raise APIError('Нужна авторизация', status=401)
+    return stream_feed(request, feeds.follow_posts(request.user))
+
+
+@require_safe
+@conditional_post(per_user=False)
+@api_view
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id
+    )
+    return JsonResponse(
+        serialize(post, requested_fields(request)),
+        json_dumps_params={'ensure_ascii': False}
+    )
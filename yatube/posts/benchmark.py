@@ -0,0 +1,288 @@
+"""Нагрузочные замеры лент (см. manage.py benchmark).
+
+seed() наполняет базу пользователями, группами, постами, комментариями
+и подписками, run() прогоняет сценарии через тестовый клиент Django или
+через локальный WSGI-сервер и считает пропускную способность и задержки.
+"""
+import math
+import random
+import re
+import threading
+from contextlib import nullcontext
+from time import perf_counter
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+import requests
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.template import warm_up
+
+from . import counters, search, timeline
+from .models import Comment, Follow, Group, Post, User
+
+SCENARIOS = (
+    'index',
+    'group_posts',
+    'profile',
+    'post_detail',
+    'follow_index',
+    'add_comment',
+)
+
+
+def seed(users=100, groups=10, posts=1000, comments=2000, follows=1000,
+         random_seed=0):
+    """Наполняет базу данными заданного объёма.
+
+    Записи создаются через bulk_create, поэтому счётчики, ленты подписок
+    и поисковый индекс пересобираются в конце целиком.
+    """
+    rnd = random.Random(random_seed)
+    password = make_password(None)
+    User.objects.bulk_create(
+        [
+            User(username=f'bench_{num}', password=password)
+            for num in range(users)
+        ]
+    )
+    user_ids = list(
+        User.objects.filter(
+            username__startswith='bench_'
+        ).values_list('pk', flat=True)
+    )
+    Group.objects.bulk_create(
+        [
+            Group(
+                title=f'Группа {num}',
+                slug=f'bench-{num}',
+                description='Группа для нагрузочных замеров'
+            )
+            for num in range(groups)
+        ]
+    )
+    group_ids = list(
+        Group.objects.filter(
+            slug__startswith='bench-'
+        ).values_list('pk', flat=True)
+    )
+    Post.objects.bulk_create(
+        (
+            Post(
+                author_id=rnd.choice(user_ids),
+                group_id=rnd.choice(group_ids + [None]),
+                text=f'Пост номер {num} для нагрузочных замеров'
+            )
+            for num in range(posts)
+        )
+    )
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    Comment.objects.bulk_create(
+        (
+            Comment(
+                post_id=rnd.choice(post_ids),
+                author_id=rnd.choice(user_ids),
+                text=f'Комментарий {num}'
+            )
+            for num in range(comments)
+        )
+    )
+    pairs = set()
+    while len(pairs) < min(follows, len(user_ids) * (len(user_ids) - 1)):
+        user_id, author_id = rnd.sample(user_ids, 2)
+        pairs.add((user_id, author_id))
+    Follow.objects.bulk_create(
+        [Follow(user_id=user, author_id=author) for user, author in pairs]
+    )
+    counters.recount()
+    timeline.rebuild()
+    search.rebuild()
+
+
+def scenario_requests(rnd):
+    """Возвращает функцию, выдающую (метод, url, данные) для сценария."""
+    users = list(
+        User.objects.filter(posts__isnull=False).distinct().values_list(
+            'username', flat=True
+        )[:100]
+    )
+    slugs = list(Group.objects.values_list('slug', flat=True)[:100])
+    post_ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+
+    def build(name):
+        if name == 'index':
+            return 'GET', reverse('posts:index'), None
+        if name == 'group_posts':
+            return 'GET', reverse(
+                'posts:group_list', args=[rnd.choice(slugs)]
+            ), None
+        if name == 'profile':
+            return 'GET', reverse(
+                'posts:profile', args=[rnd.choice(users)]
+            ), None
+        if name == 'post_detail':
+            return 'GET', reverse(
+                'posts:post_detail', args=[rnd.choice(post_ids)]
+            ), None
+        if name == 'follow_index':
+            return 'GET', reverse('posts:follow_index'), None
+        if name == 'add_comment':
+            return 'POST', reverse(
+                'posts:add_comment', args=[rnd.choice(post_ids)]
+            ), {'text': 'Комментарий из нагрузочного замера'}
+        raise ValueError(f'Неизвестный сценарий: {name}')
+    return build
+
+
+def template_settings(cached):
+    """TEMPLATES с загрузчиком шаблонов с кешем или без него."""
+    loaders = settings.TEMPLATE_LOADERS
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    return [
+        {**config, 'OPTIONS': {**config['OPTIONS'], 'loaders': loaders}}
+        for config in settings.TEMPLATES
+    ]
+
+
+def render_time(server_timing):
+    """Время шаблонов в секундах из заголовка Server-Timing."""
+    match = re.search(r'tpl;dur=([\d.]+)', server_timing or '')
+    return float(match.group(1)) / 1000 if match else 0.0
+
+
+def benchmark_user():
+    """Пользователь с наибольшим числом подписок — худший случай ленты."""
+    return User.objects.order_by('-stats__following_count').first()
+
+
+class ClientTransport:
+    """Запросы через тестовый клиент Django, без сети."""
+
+    def __init__(self, user):
+        self.client = Client()
+        self.client.force_login(user)
+
+    def request(self, method, url, data):
+        if method == 'POST':
+            response = self.client.post(url, data)
+        else:
+            response = self.client.get(url)
+        return response.status_code, response.get('Server-Timing')
+
+    def close(self):
+        pass
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class ServerTransport:
+    """Запросы по HTTP к локальному WSGI-серверу в отдельном потоке."""
+
+    def __init__(self, user):
+        self.server = make_server(
+            '127.0.0.1', 0, WSGIHandler(), handler_class=QuietHandler
+        )
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, daemon=True
+        )
+        self.thread.start()
+        self.base_url = 'http://127.0.0.1:{}'.format(self.server.server_port)
+        client = Client()
+        client.force_login(user)
+        self.session = requests.Session()
+        for name, morsel in client.cookies.items():
+            self.session.cookies.set(name, morsel.value)
+        self.session.get(self.base_url + reverse('posts:post_create'))
+        self.csrf_token = self.session.cookies.get(settings.CSRF_COOKIE_NAME)
+
+    def request(self, method, url, data):
+        if method == 'POST':
+            response = self.session.post(
+                self.base_url + url,
+                data=data,
+                headers={
+                    'X-CSRFToken': self.csrf_token,
+                    'Referer': self.base_url,
+                },
+                allow_redirects=False
+            )
+        else:
+            response = self.session.get(self.base_url + url)
+        return response.status_code, response.headers.get('Server-Timing')
+
+    def close(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def percentile(sorted_values, fraction):
+    index = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def run(scenarios=SCENARIOS, iterations=100, transport='client',
+        cold_cache=False, random_seed=0, template_cache=None):
+    """Прогоняет сценарии и возвращает задержки и пропускную способность.
+
+    ``template_cache`` — включить (True) или выключить (False) кеш
+    загрузчика шаблонов на время замера; None — как в настройках.
+    """
+    if template_cache is None:
+        templates = nullcontext()
+    else:
+        templates = override_settings(
+            TEMPLATES=template_settings(template_cache)
+        )
+    with templates:
+        if template_cache:
+            warm_up()
+        return run_scenarios(
+            scenarios, iterations, transport, cold_cache, random_seed
+        )
+
+
+def run_scenarios(scenarios, iterations, transport, cold_cache, random_seed):
+    rnd = random.Random(random_seed)
+    build = scenario_requests(rnd)
+    user = benchmark_user()
+    transport = {
+        'client': ClientTransport, 'server': ServerTransport
+    }[transport](user)
+    results = {}
+    try:
+        for name in scenarios:
+            timings = []
+            render = 0.0
+            errors = 0
+            for _ in range(iterations):
+                if cold_cache:
+                    cache.clear()
+                method, url, data = build(name)
+                started = perf_counter()
+                status, server_timing = transport.request(method, url, data)
+                timings.append(perf_counter() - started)
+                render += render_time(server_timing)
+                errors += status >= 400
+            timings.sort()
+            total = sum(timings)
+            results[name] = {
+                'requests': iterations,
+                'errors': errors,
+                'rps': round(iterations / total, 2) if total else None,
+                'mean_ms': round(total / iterations * 1000, 3),
+                'p50_ms': round(percentile(timings, 0.5) * 1000, 3),
+                'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+                'render_mean_ms': round(render / iterations * 1000, 3),
+            }
+    finally:
+        transport.close()
+    return results
@@ -0,0 +1,100 @@
+"""Версионированный кеш страниц лент.
+
+Каждая лента ('index', 'group:<slug>', 'profile:<username>') имеет в кеше
+своё поколение, а все ленты вместе — общее поколение 'all'. Поколения
+входят в префикс ключа cache_page, поэтому страницы живут до изменения
+данных (см. signals), а не фиксированные 20 секунд.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.views.decorators.cache import cache_page
+
+from core.metrics import record_cache
+from core.routers import replicas_enabled
+
+ALL_FEEDS = 'all'
+
+
+def generation_key(feed):
+    return 'feed_generation:' + hashlib.md5(feed.encode()).hexdigest()
+
+
+def feed_generations(*feeds):
+    """Возвращает поколения лент, заводя недостающие.
+
+    Поколение — время последнего изменения ленты, поэтому после вытеснения
+    из кеша оно не совпадёт ни с одним из прежних значений.
+    """
+    keys = {generation_key(feed): feed for feed in feeds}
+    generations = cache.get_many(keys)
+    for key in keys.keys() - generations.keys():
+        cache.add(key, time.time(), None)
+        generations[key] = cache.get(key)
+    return {feed: generations[key] for key, feed in keys.items()}
+
+
+def bump_feeds(*feeds):
+    """Сбрасывает закешированные страницы перечисленных лент."""
+    now = time.time()
+    cache.set_many({generation_key(feed): now for feed in feeds}, None)
+
+
+def post_feeds(post, *group_slugs):
+    """Ленты, на которых выводится пост."""
+    feeds = ['index', f'profile:{post.author.username}']
+    feeds += [f'group:{slug}' for slug in group_slugs if slug]
+    return feeds
+
+
+def feed_cache_key(prefix, feed):
+    """Ключ, который перестаёт использоваться при смене поколения ленты.
+
+    Возвращает None, если данные нельзя кешировать: лента изменилась
+    недавно, а запрос читает с реплики, которая может отставать.
+    """
+    generations = feed_generations(ALL_FEEDS, feed)
+    if (replicas_enabled() and time.time() - max(generations.values())
+            < settings.REPLICA_PIN_SECONDS):
+        return None
+    return '{}:{}:{}:{}'.format(
+        prefix,
+        hashlib.md5(feed.encode()).hexdigest(),
+        generations[ALL_FEEDS],
+        generations[feed]
+    )
+
+
+def cache_feed(feed):
+    """Кеширует страницы ленты до смены её поколения.
+
+    ``feed`` — шаблон имени ленты, который заполняется аргументами
+    представления, например 'group:{slug}'. Страница выводит шапку
+    текущего пользователя, поэтому копия своя у каждого пользователя,
+    а анонимные посетители получают одну общую.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            key_prefix = feed_cache_key('feed', feed.format(**kwargs))
+            if key_prefix is None:
+                record_cache(misses=1)
+                return view_func(request, *args, **kwargs)
+            key_prefix = f'{key_prefix}:{request.user.pk}'
+            rendered = []
+
+            def render_feed(*args, **kwargs):
+                rendered.append(True)
+                return view_func(*args, **kwargs)
+
+            cached_view = cache_page(
+                settings.FEED_CACHE_TIMEOUT, key_prefix=key_prefix
+            )(render_feed)
+            response = cached_view(request, *args, **kwargs)
+            record_cache(hits=int(not rendered), misses=int(bool(rendered)))
+            return response
+        return wrapper
+    return decorator
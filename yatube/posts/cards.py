@@ -0,0 +1,54 @@
+"""Кеш отрендеренных карточек постов (includes/article.html).
+
+Ключ карточки содержит id поста и время его изменения, поэтому правка
+поста, его группы или автора (см. signals) даёт новый ключ, а лента
+собирается одним get_many из кеша.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core.metrics import record_cache
+
+CARD_TEMPLATE = 'includes/article.html'
+
+
+def card_key(post):
+    return f'post_card:{post.pk}:{post.updated.timestamp()}'
+
+
+def render_cards(posts):
+    """Возвращает HTML карточек постов, недостающие рендерит и кеширует."""
+    keys = {card_key(post): post for post in posts}
+    cached = cache.get_many(keys)
+    prefetch_related_objects(
+        [
+            post for key, post in keys.items()
+            if key not in cached and post.image
+        ],
+        'image_variants'
+    )
+    rendered = {}
+    cards = []
+    for key, post in keys.items():
+        card = cached.get(key)
+        if card is None:
+            card = rendered[key] = render_to_string(
+                CARD_TEMPLATE, {'post': post}
+            )
+        cards.append(card)
+    record_cache(hits=len(cached), misses=len(rendered))
+    if rendered:
+        cache.set_many(rendered, settings.POST_CARD_TIMEOUT)
+    return cards
+
+
+def forget_card(post):
+    cache.delete(card_key(post))
+
+
+def touch_posts(posts):
+    """Обновляет версию постов, чтобы их карточки отрендерились заново."""
+    posts.update(updated=timezone.now())
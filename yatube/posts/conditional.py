@@ -0,0 +1,124 @@
+"""Условные GET-запросы (ETag и Last-Modified) для лент и постов.
+
+Валидаторы ленты строятся из её поколений (см. caching): поколение — это
+время последнего изменения, поэтому оно же служит Last-Modified. Пост
+сравнивается по времени изменения, числу комментариев, времени
+последнего комментария и числу постов автора, которое выводится на его
+странице. На неизменившуюся страницу отвечается 304 без
+запроса ленты и рендера шаблона.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .caching import ALL_FEEDS, feed_generations
+from .models import Comment, Post
+
+
+def make_etag(*parts):
+    return hashlib.md5(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def request_parts(request, per_user):
+    """Части запроса, от которых зависит ответ."""
+    parts = [request.GET.urlencode()]
+    if per_user:
+        parts.append(request.user.pk)
+    return parts
+
+
+def revalidated(etag_func, last_modified_func, per_user):
+    """condition() с заголовками, по которым клиент проверяет копию.
+
+    Страницы лент кешируются на сервере надолго (см. caching), но клиент
+    должен каждый раз спрашивать сервер, не изменились ли они.
+    """
+    def decorator(view_func):
+        conditional_view = condition(
+            etag_func=etag_func, last_modified_func=last_modified_func
+        )(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('Expires'):
+                del response['Expires']
+            patch_cache_control(response, max_age=0)
+            if per_user:
+                patch_cache_control(response, private=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_feed(feed, per_user=True):
+    """Отвечает 304, если лента не менялась с прошлого запроса клиента.
+
+    ``feed`` — шаблон имени ленты, который заполняется аргументами
+    представления, или функция (request, **kwargs), возвращающая имя
+    ленты либо None, если проверять нечего. При ``per_user`` ответ
+    считается разным для разных пользователей.
+    """
+    def generations(request, kwargs):
+        if not hasattr(request, '_feed_generations'):
+            if isinstance(feed, str):
+                name = feed.format(**kwargs)
+            else:
+                name = feed(request, **kwargs)
+            request._feed_generations = (
+                name and feed_generations(ALL_FEEDS, name)
+            )
+        return request._feed_generations
+
+    def etag(request, *args, **kwargs):
+        values = generations(request, kwargs)
+        if not values:
+            return None
+        return make_etag(
+            *sorted(values.items()), *request_parts(request, per_user)
+        )
+
+    def last_modified(request, *args, **kwargs):
+        values = generations(request, kwargs)
+        if not values:
+            return None
+        return datetime.fromtimestamp(max(values.values()), timezone.utc)
+
+    return revalidated(etag, last_modified, per_user)
+
+
+def conditional_post(per_user=True):
+    """Отвечает 304, если пост и комментарии к нему не менялись."""
+    def versions(request, post_id):
+        if not hasattr(request, '_post_versions'):
+            last_comment = Comment.objects.filter(
+                post=OuterRef('pk')
+            ).order_by('-created').values('created')[:1]
+            request._post_versions = Post.objects.filter(
+                pk=post_id
+            ).values_list(
+                'updated',
+                'comments_count',
+                Subquery(last_comment),
+                'author__stats__posts_count'
+            ).first()
+        return request._post_versions
+
+    def etag(request, post_id):
+        values = versions(request, post_id)
+        if values is None:
+            return None
+        return make_etag(*values, *request_parts(request, per_user))
+
+    def last_modified(request, post_id):
+        values = versions(request, post_id)
+        if values is None:
+            return None
+        updated, _, last_comment, _ = values
+        return max(filter(None, (updated, last_comment)))
+
+    return revalidated(etag, last_modified, per_user)
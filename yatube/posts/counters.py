@@ -0,0 +1,70 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются выражениями F() в тех же транзакциях, что и записи
+Post, Comment и Follow (см. signals и представления). Если они разошлись
+с данными, их пересчитывает manage.py recount_counters. До пересчёта
+уменьшение не опускает счётчик ниже нуля, чтобы удаление не падало на
+ограничении поля.
+"""
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Comment, Follow, Post, User
+
+
+def changed(field, delta):
+    """Новое значение счётчика, не меньше нуля."""
+    if delta < 0:
+        return Greatest(F(field) + delta, 0)
+    return F(field) + delta
+
+
+def change_author_counter(user_id, field, delta):
+    if AuthorStats.objects.filter(user_id=user_id).update(
+        **{field: changed(field, delta)}
+    ) or delta < 0:
+        return
+    AuthorStats.objects.get_or_create(user_id=user_id)
+    AuthorStats.objects.filter(user_id=user_id).update(
+        **{field: changed(field, delta)}
+    )
+
+
+def change_comments_counter(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=changed('comments_count', delta)
+    )
+
+
+def count_subquery(queryset, field, outer='pk'):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef(outer)}).order_by().values(
+                field
+            ).annotate(total=Count('pk')).values('total')
+        ),
+        0
+    )
+
+
+def recount():
+    """Пересчитывает все счётчики по данным таблиц."""
+    AuthorStats.objects.bulk_create(
+        [
+            AuthorStats(user_id=user_id)
+            for user_id in User.objects.filter(
+                stats__isnull=True
+            ).values_list('pk', flat=True).iterator()
+        ],
+        ignore_conflicts=True
+    )
+    Post.objects.update(
+        comments_count=count_subquery(Comment.objects.all(), 'post')
+    )
+    AuthorStats.objects.update(
+        posts_count=count_subquery(Post.objects.all(), 'author', 'user'),
+        followers_count=count_subquery(
+            Follow.objects.all(), 'author', 'user'
+        ),
+        following_count=count_subquery(Follow.objects.all(), 'user', 'user'),
+    )
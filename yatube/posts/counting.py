@@ -0,0 +1,102 @@
+"""Число записей лент для постраничной навигации.
+
+Точный COUNT(*) ленты кешируется до смены её поколения (см. caching и
+signals). Если в прошлый раз в ленте было больше
+FEED_COUNT_ESTIMATE_THRESHOLD записей, вместо COUNT(*) берётся оценка
+планировщика: для навигации по страницам точное число не нужно.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connections
+
+from .caching import feed_cache_key
+
+
+def estimate_postgresql(queryset):
+    """Оценка числа строк из плана запроса PostgreSQL."""
+    sql, params = queryset.query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def estimate_sqlite(queryset):
+    """Оценка числа строк из статистики ANALYZE (sqlite_stat1).
+
+    SQLite хранит только размеры таблиц и индексов, поэтому оценка есть
+    лишь для запроса без условий.
+    """
+    if queryset.query.where:
+        return None
+    with connections[queryset.db].cursor() as cursor:
+        try:
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s',
+                [queryset.model._meta.db_table]
+            )
+        except OperationalError:
+            # ANALYZE ещё не запускался
+            return None
+        row = cursor.fetchone()
+    return row and int(row[0].split()[0])
+
+
+ESTIMATORS = {
+    'postgresql': estimate_postgresql,
+    'sqlite': estimate_sqlite,
+}
+
+
+def estimate_count(queryset):
+    """Оценка числа записей без чтения таблицы или None."""
+    estimator = ESTIMATORS.get(connections[queryset.db].vendor)
+    if estimator is None:
+        return None
+    return estimator(queryset.order_by())
+
+
+def large_count(queryset):
+    """Оценка числа записей, если их больше порога, иначе точное число.
+
+    Для выборок без кеша (например, списков админки): если оценка
+    недоступна, считается COUNT(*).
+    """
+    estimate = estimate_count(queryset)
+    if (estimate is not None
+            and estimate > settings.FEED_COUNT_ESTIMATE_THRESHOLD):
+        return estimate
+    return queryset.count()
+
+
+def feed_count(queryset, feed=None):
+    """Число записей ленты ``feed``, закешированное до её изменения.
+
+    Условие запроса входит в ключ, поэтому разные выборки одной ленты
+    не смешиваются. Последнее число записей хранится и после смены
+    поколения и подсказывает, стоит ли считать ленту точно.
+    """
+    if feed is None:
+        return queryset.count()
+    query = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = feed_cache_key(f'feed_count:{query}', feed)
+    if key is None:
+        return queryset.count()
+    hint_key = f'feed_count_hint:{query}'
+    cached = cache.get_many([key, hint_key])
+    if key in cached:
+        return cached[key]
+    count = None
+    if cached.get(hint_key, 0) > settings.FEED_COUNT_ESTIMATE_THRESHOLD:
+        count = estimate_count(queryset)
+    if count is None:
+        count = queryset.count()
+    cache.set_many(
+        {key: count, hint_key: count}, settings.FEED_CACHE_TIMEOUT
+    )
+    return count
@@ -0,0 +1,27 @@
+"""Выборки постов для лент: общие для HTML-страниц и API."""
+from .models import Post
+from .timeline import timeline_feed, timeline_posts
+
+
+def index_posts():
+    return Post.objects.select_related('author', 'group')
+
+
+def group_posts(group):
+    # группа постов известна менеджеру и подставляется без запроса
+    return group.posts.select_related('author')
+
+
+def profile_posts(author):
+    return Post.objects.select_related('author', 'group').filter(
+        author=author
+    )
+
+
+def follow_posts(user):
+    return timeline_posts(user).select_related('author', 'group')
+
+
+def follow_feed(user):
+    """Имя ленты подписок в posts.caching или None (см. timeline)."""
+    return timeline_feed(user)
@@ -0,0 +1,91 @@
+"""Подписки текущего пользователя для страниц.
+
+Авторы, на которых подписан пользователь, читаются одним запросом и
+хранятся в кеше до его подписки или отписки (см. signals) либо до смены
+общего поколения лент, например после загрузки данных (см. transfer).
+
+Карточки постов кешируются общими для всех пользователей и не должны
+выводить подписки. Страницы лент кешируются для каждого пользователя
+отдельно (см. caching.cache_feed), а подписка сбрасывает ленту автора,
+поэтому кнопка подписки на странице профиля показывает состояние
+текущего пользователя.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from core.routers import replicas_enabled
+
+from .caching import ALL_FEEDS, feed_generations, generation_key
+from .models import Follow
+
+
+def cache_key(user_id):
+    return f'follows:{user_id}'
+
+
+def following_ids(user):
+    """id авторов, на которых подписан пользователь."""
+    if not user.is_authenticated:
+        return frozenset()
+    key = cache_key(user.pk)
+    all_key = generation_key(ALL_FEEDS)
+    values = cache.get_many([all_key, key])
+    generation = values.get(all_key)
+    if generation is None:
+        generation = feed_generations(ALL_FEEDS)[ALL_FEEDS]
+    cached = values.get(key)
+    if cached is not None and cached[0] == generation:
+        return cached[1]
+    ids = frozenset(
+        Follow.objects.filter(user=user).values_list('author_id', flat=True)
+    )
+    # реплика может отставать, в кеш попадает только основная база
+    if not replicas_enabled():
+        cache.set(key, (generation, ids), settings.FOLLOWS_CACHE_TIMEOUT)
+    return ids
+
+
+def forget(user_id):
+    key = cache_key(user_id)
+    cache.delete(key)
+    # до коммита другой запрос мог вернуть в кеш прежние подписки
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class FollowState:
+    """Авторы, на которых подписан пользователь; читаются при обращении.
+
+    Проверяется принадлежность автора или его id: ``author in state``.
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def ids(self):
+        return following_ids(self.user)
+
+    def __contains__(self, author):
+        return getattr(author, 'pk', author) in self.ids
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def states(self, authors):
+        """Подписан ли пользователь на каждого из авторов, по id."""
+        return {
+            getattr(author, 'pk', author): author in self
+            for author in authors
+        }
+
+
+def for_request(request):
+    """Подписки пользователя запроса, одни на весь запрос."""
+    if not hasattr(request, '_follow_state'):
+        request._follow_state = FollowState(request.user)
+    return request._follow_state
@@ -0,0 +1,112 @@
+import json
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+from django.utils import timezone
+
+from posts import benchmark
+
+TEMPLATE_MODES = {'cached': True, 'uncached': False}
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочные замеры лент на отдельной тестовой базе: '
+        'пропускная способность и задержки p50/p99 в формате JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=2000)
+        parser.add_argument('--follows', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=100)
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=benchmark.SCENARIOS,
+            default=list(benchmark.SCENARIOS)
+        )
+        parser.add_argument(
+            '--transport',
+            choices=('client', 'server'),
+            default='client',
+            help='Тестовый клиент Django или локальный WSGI-сервер'
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кеш перед каждым запросом'
+        )
+        parser.add_argument(
+            '--templates',
+            nargs='+',
+            choices=TEMPLATE_MODES,
+            help=(
+                'Сравнить загрузку шаблонов с кешем (cached) и без него '
+                '(uncached); по умолчанию — как в настройках'
+            )
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output',
+            help='Файл для результатов (по умолчанию stdout)'
+        )
+
+    def handle(self, *args, **options):
+        volumes = {
+            name: options[name]
+            for name in ('users', 'groups', 'posts', 'comments', 'follows')
+        }
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            benchmark.seed(random_seed=options['seed'], **volumes)
+            run_options = {
+                'iterations': options['iterations'],
+                'transport': options['transport'],
+                'cold_cache': options['cold'],
+                'random_seed': options['seed'],
+            }
+            if options['templates']:
+                results = {
+                    mode: benchmark.run(
+                        options['scenarios'],
+                        template_cache=TEMPLATE_MODES[mode],
+                        **run_options
+                    )
+                    for mode in options['templates']
+                }
+            else:
+                results = benchmark.run(options['scenarios'], **run_options)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        report = {
+            'commit': current_commit(),
+            'created': timezone.now().isoformat(),
+            'transport': options['transport'],
+            'cold_cache': options['cold'],
+            'iterations': options['iterations'],
+            'templates': options['templates'],
+            'volumes': volumes,
+            'results': results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+        sys.stdout.flush()
@@ -0,0 +1,42 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+PROGRESS_EVERY = 10000
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты, комментарии или подписки в NDJSON или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=transfer.SPECS)
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для выгрузки (по умолчанию стандартный вывод)'
+        )
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default='ndjson'
+        )
+
+    def handle(self, *args, **options):
+        spec = transfer.SPECS[options['model']]
+        if options['output'] == '-':
+            self.export(spec, sys.stdout, options['format'])
+            return
+        with open(options['output'], 'w', encoding='utf-8',
+                  newline='') as stream:
+            self.export(spec, stream, options['format'])
+
+    def export(self, spec, stream, fmt):
+        count = 0
+        for count in transfer.write_records(
+            transfer.export_rows(spec), stream, fmt, spec.names
+        ):
+            if count % PROGRESS_EVERY == 0:
+                self.stderr.write(f'Выгружено записей: {count}')
+        self.stderr.write(
+            self.style.SUCCESS(f'Выгрузка завершена, записей: {count}')
+        )
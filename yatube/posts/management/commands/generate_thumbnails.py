@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+from posts.thumbnails import generate_variants
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры картинок постов, у которых их ещё нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Перестроить миниатюры всех постов с картинками'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['all']:
+            posts = posts.filter(image_variants__isnull=True)
+        total = 0
+        for post_id in posts.values_list('pk', flat=True).iterator():
+            generate_variants(post_id)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано постов: {total}'))
@@ -0,0 +1,54 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты, комментарии или подписки из NDJSON или CSV '
+        'и пересобирает счётчики, ленты подписок и поисковый индекс'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=transfer.SPECS)
+        parser.add_argument(
+            'path', help='Файл с данными ("-" — стандартный ввод)'
+        )
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default='ndjson'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--no-rebuild',
+            action='store_true',
+            help=(
+                'Не пересобирать производные данные, например если следом '
+                'загружается следующий файл'
+            )
+        )
+
+    def handle(self, *args, **options):
+        if options['path'] == '-':
+            self.load(sys.stdin, options)
+        else:
+            with open(options['path'], encoding='utf-8',
+                      newline='') as stream:
+                self.load(stream, options)
+        if not options['no_rebuild']:
+            self.stderr.write('Пересборка счётчиков, лент и индекса…')
+            transfer.finish_import()
+        self.stdout.write(self.style.SUCCESS('Загрузка завершена'))
+
+    def load(self, stream, options):
+        spec = transfer.SPECS[options['model']]
+        records = transfer.read_records(stream, options['format'])
+        try:
+            for count in transfer.import_records(
+                spec, records, options['batch_size']
+            ):
+                self.stderr.write(f'Загружено записей: {count}')
+        except (ValueError, KeyError, DatabaseError) as error:
+            raise CommandError(f'Ошибка загрузки: {error!r}')
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters, timeline
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписок'
+
+    def handle(self, *args, **options):
+        counters.recount()
+        # от числа подписчиков зависит, раскладываются ли посты по лентам
+        timeline.sync_celebrities()
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
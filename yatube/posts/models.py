@@ -27,6 +27,10 @@ class Post(models.Model):
         verbose_name='Дата публикации',
         db_index=True
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -48,15 +52,75 @@ class Post(models.Model):
         blank=True,
         null=True
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # ленты автора и группы читаются по индексу уже в нужном порядке
+        indexes = (
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', '-pub_date'),
+                name='post_group_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:settings.NUM_POST_LETTERS]
 
+    def image_variant(self, name):
+        """Готовая миниатюра картинки или None, если её ещё нет."""
+        if not self.image:
+            return None
+        for variant in self.image_variants.all():
+            if variant.name == name and variant.source == self.image.name:
+                return variant
+        return None
+
+    @property
+    def card_image(self):
+        return self.image_variant('card')
+
+
+class ImageVariant(models.Model):
+    """Заранее подготовленная миниатюра картинки поста."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_variants',
+        verbose_name='Пост'
+    )
+    name = models.CharField(max_length=50, verbose_name='Вариант')
+    source = models.CharField(
+        max_length=255,
+        verbose_name='Исходная картинка'
+    )
+    url = models.CharField(max_length=255, verbose_name='Адрес миниатюры')
+    width = models.PositiveIntegerField(verbose_name='Ширина')
+    height = models.PositiveIntegerField(verbose_name='Высота')
+
+    class Meta:
+        verbose_name = 'Миниатюра'
+        verbose_name_plural = 'Миниатюры'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('post', 'name'),
+                name='unique_image_variant'
+            ),
+        )
+
+    def __str__(self):
+        return self.url
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -84,6 +148,12 @@ class Comment(models.Model):
         ordering = ('-created',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', '-created'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:settings.NUM_POST_LETTERS]
@@ -104,6 +174,84 @@ class Follow(models.Model):
     class Meta:
         verbose_name = 'Подписка'
         verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} → {self.author}'
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счётчики пользователя (см. posts.counters)."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок'
+    )
+    # больше TIMELINE_FANOUT_LIMIT подписчиков, см. posts.timeline
+    is_celebrity = models.BooleanField(
+        default=False,
+        db_index=True,
+        verbose_name='Посты подмешиваются в ленты при чтении'
+    )
+
+    class Meta:
+        verbose_name = 'Счётчики автора'
+        verbose_name_plural = 'Счётчики авторов'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.posts_count}'
+
+
+class TimelineEntry(models.Model):
+    """Запись ленты подписок пользователя (fan-out-on-write)."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date'),
+                name='timeline_user_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
-        return self.author
+        return f'{self.user_id}: {self.post_id}'
@@ -0,0 +1,121 @@
+"""Полнотекстовый поиск по постам.
+
+Текст поста разбивается на слова и приводится к основам (posts.stemmer),
+основы хранятся в инвертированном индексе, который обновляется при
+сохранении и удалении поста (см. signals). Индекс реализует бэкенд из
+SEARCH_BACKEND:
+
+* FTS5Backend — виртуальная таблица SQLite FTS5, результаты
+  упорядочены по релевантности (bm25);
+* SimpleBackend — без индекса, поиск основ через icontains, для баз без
+  полнотекстового поиска.
+"""
+import re
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Post
+from .stemmer import stem
+
+WORD_RE = re.compile(r'\w+')
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def terms(text):
+    """Основы слов текста в порядке их появления."""
+    return [stem(word) for word in WORD_RE.findall(text)]
+
+
+class FTS5Backend:
+    table = 'posts_post_fts'
+
+    def index(self, posts):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} (rowid, terms) '
+                'VALUES (%s, %s)',
+                [(pk, ' '.join(terms(text))) for pk, text in posts]
+            )
+
+    def remove(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE rowid = %s',
+                [(pk,) for pk in post_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, queryset, query):
+        query_terms = terms(query)
+        if not query_terms:
+            return queryset.none()
+        # каждая основа ищется как префикс, условия объединяются через AND
+        match = ' '.join(f'"{term}"*' for term in query_terms)
+        return queryset.extra(
+            select={'search_rank': f'bm25({self.table})'},
+            tables=[self.table],
+            where=[
+                f'{self.table}.rowid = {Post._meta.db_table}.id',
+                f'{self.table} MATCH %s',
+            ],
+            params=[match],
+        ).order_by('search_rank', '-pub_date', '-pk')
+
+
+class SimpleBackend:
+    def index(self, posts):
+        pass
+
+    def remove(self, post_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, queryset, query):
+        query_terms = terms(query)
+        if not query_terms:
+            return queryset.none()
+        condition = Q()
+        for term in query_terms:
+            condition &= Q(text__icontains=term)
+        return queryset.filter(condition).order_by('-pub_date', '-pk')
+
+
+def get_backend():
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+def search_posts(query, queryset=None):
+    """Посты, подходящие под запрос, самые релевантные первыми."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    return get_backend().search(queryset, query)
+
+
+def index_posts(posts):
+    get_backend().index((post.pk, post.text) for post in posts)
+
+
+def remove_posts(post_ids):
+    get_backend().remove(post_ids)
+
+
+def rebuild():
+    """Заново строит индекс по всем постам, по REBUILD_BATCH_SIZE за раз."""
+    backend = get_backend()
+    backend.clear()
+    posts = Post.objects.values_list('pk', 'text').iterator()
+    while True:
+        batch = list(islice(posts, REBUILD_BATCH_SIZE))
+        if not batch:
+            break
+        backend.index(batch)
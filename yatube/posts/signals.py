@@ -0,0 +1,143 @@
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from . import (cards, counters, follows, search, tasks, thumbnails,
+               timeline)
+from .caching import ALL_FEEDS, bump_feeds, post_feeds
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+
+# Поля пользователя, которые выводятся в карточке поста
+CARD_USER_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+@receiver(pre_save, sender=Post)
+def post_saving(sender, instance, raw=False, **kwargs):
+    instance._previous_group_slug = None
+    instance._previous_image = None
+    if instance.pk and not raw:
+        instance._previous_group_slug, instance._previous_image = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'group__slug', 'image'
+            ).first() or (None, None)
+        )
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.change_author_counter(instance.author_id, 'posts_count', 1)
+        tasks.fan_out_post.delay(instance.pk)
+    search.index_posts([instance])
+    if instance.image and instance.image.name != instance._previous_image:
+        thumbnails.schedule_variants(instance)
+    bump_feeds(*post_feeds(
+        instance,
+        instance.group and instance.group.slug,
+        instance._previous_group_slug
+    ))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_author_counter(instance.author_id, 'posts_count', -1)
+    cards.forget_card(instance)
+    tasks.forget_post.delay(instance.author_id)
+    search.remove_posts([instance.pk])
+    bump_feeds(*post_feeds(instance, instance.group and instance.group.slug))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        cards.touch_posts(instance.posts.all())
+        bump_feeds(ALL_FEEDS)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    cards.touch_posts(instance.posts.all())
+    bump_feeds(ALL_FEEDS)
+
+
+def card_user_fields(user):
+    return {field: getattr(user, field) for field in CARD_USER_FIELDS}
+
+
+@receiver(pre_save, sender=User)
+def user_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_card_fields = None
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not CARD_USER_FIELDS & update_fields:
+        return
+    instance._previous_card_fields = User.objects.filter(
+        pk=instance.pk
+    ).values(*CARD_USER_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        AuthorStats.objects.create(user=instance)
+        return
+    previous = getattr(instance, '_previous_card_fields', None)
+    # пароль, last_login и прочие поля в карточках не выводятся
+    if previous is None or previous == card_user_fields(instance):
+        return
+    cards.touch_posts(instance.posts.all())
+    bump_feeds(ALL_FEEDS)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    bump_feeds(ALL_FEEDS)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_comments_counter(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.change_comments_counter(instance.post_id, -1)
+
+
+def follow_feeds(follow):
+    # профиль автора выводит число подписчиков, профиль читателя — подписок
+    return (
+        f'profile:{follow.author.username}',
+        f'profile:{follow.user.username}',
+    )
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_author_counter(
+            instance.author_id, 'followers_count', 1
+        )
+        counters.change_author_counter(
+            instance.user_id, 'following_count', 1
+        )
+        follows.forget(instance.user_id)
+        timeline.update_celebrity(instance.author_id)
+        tasks.backfill_timeline.delay(instance.user_id, instance.author_id)
+        bump_feeds(*follow_feeds(instance))
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.change_author_counter(instance.author_id, 'followers_count', -1)
+    counters.change_author_counter(instance.user_id, 'following_count', -1)
+    follows.forget(instance.user_id)
+    if timeline.update_celebrity(instance.author_id):
+        tasks.backfill_followers.delay(instance.author_id)
+    tasks.prune_timeline.delay(instance.user_id, instance.author_id)
+    bump_feeds(*follow_feeds(instance))
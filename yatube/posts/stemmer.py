@@ -0,0 +1,110 @@
+"""Стеммер русского языка по алгоритму Snowball (Портер).
+
+Описание алгоритма: https://snowballstem.org/algorithms/russian/stemmer.html
+"""
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = (
+    ('в', 'вши', 'вшись'),
+    ('ив', 'ивши', 'ившись', 'ыв', 'ывши', 'ывшись'),
+)
+REFLEXIVE = ((), ('ся', 'сь'))
+ADJECTIVE = ((), (
+    'ее', 'ие', 'ые', 'ое', 'ими', 'ыми', 'ей', 'ий', 'ый', 'ой', 'ем',
+    'им', 'ым', 'ом', 'его', 'ого', 'ему', 'ому', 'их', 'ых', 'ую', 'юю',
+    'ая', 'яя', 'ою', 'ею',
+))
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+VERB = (
+    ('ла', 'на', 'ете', 'йте', 'ли', 'й', 'л', 'ем', 'н', 'ло', 'но', 'ет',
+     'ют', 'ны', 'ть', 'ешь', 'нно'),
+    ('ила', 'ыла', 'ена', 'ейте', 'уйте', 'ите', 'или', 'ыли', 'ей', 'уй',
+     'ил', 'ыл', 'им', 'ым', 'ен', 'ило', 'ыло', 'ено', 'ят', 'ует', 'уют',
+     'ит', 'ыт', 'ены', 'ить', 'ыть', 'ишь', 'ую', 'ю'),
+)
+NOUN = ((), (
+    'а', 'ев', 'ов', 'ие', 'ье', 'е', 'иями', 'ями', 'ами', 'еи', 'ии', 'и',
+    'ией', 'ей', 'ой', 'ий', 'й', 'иям', 'ям', 'ием', 'ем', 'ам', 'ом', 'о',
+    'у', 'ах', 'иях', 'ях', 'ы', 'ь', 'ию', 'ью', 'ю', 'ия', 'ья', 'я',
+))
+SUPERLATIVE = ((), ('ейше', 'ейш'))
+DERIVATIONAL = ((), ('ость', 'ост'))
+
+
+def _region(word, start=0):
+    """Начало области после первого сочетания гласной и согласной."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _remove_ending(word, start, endings):
+    """Отрезает самое длинное окончание из ``endings`` в области ``start``.
+
+    Окончания первой группы отрезаются, только если перед ними стоит
+    «а» или «я». Возвращает None, если окончание не найдено.
+    """
+    after_a, plain = endings
+    candidates = sorted(
+        [(ending, True) for ending in after_a]
+        + [(ending, False) for ending in plain],
+        key=lambda candidate: -len(candidate[0])
+    )
+    for ending, needs_a in candidates:
+        if not word.endswith(ending):
+            continue
+        cut = len(word) - len(ending)
+        if cut < start:
+            continue
+        if needs_a and (cut - 1 < start or word[cut - 1] not in 'ая'):
+            continue
+        return word[:cut]
+    return None
+
+
+def stem(word):
+    """Основа слова: «красивыми» -> «красив»."""
+    word = word.lower().replace('ё', 'е')
+    rv = next(
+        (index + 1 for index, char in enumerate(word) if char in VOWELS),
+        len(word)
+    )
+    r2 = _region(word, _region(word))
+
+    # Шаг 1: деепричастие либо возвратная частица и затем
+    # прилагательное, глагол или существительное
+    result = _remove_ending(word, rv, PERFECTIVE_GERUND)
+    if result is None:
+        word = _remove_ending(word, rv, REFLEXIVE) or word
+        result = _remove_ending(word, rv, ADJECTIVE)
+        if result is not None:
+            result = _remove_ending(result, rv, PARTICIPLE) or result
+        else:
+            result = _remove_ending(word, rv, VERB)
+            if result is None:
+                result = _remove_ending(word, rv, NOUN)
+    if result is not None:
+        word = result
+
+    # Шаг 2
+    if word.endswith('и') and len(word) - 1 >= rv:
+        word = word[:-1]
+
+    # Шаг 3
+    word = _remove_ending(word, r2, DERIVATIONAL) or word
+
+    # Шаг 4
+    if word.endswith('нн') and len(word) - 2 >= rv:
+        return word[:-1]
+    result = _remove_ending(word, rv, SUPERLATIVE)
+    if result is not None:
+        if result.endswith('нн') and len(result) - 2 >= rv:
+            result = result[:-1]
+        return result
+    if word.endswith('ь') and len(word) - 1 >= rv:
+        return word[:-1]
+    return word
@@ -0,0 +1,56 @@
+"""Фоновые задачи постов (см. core.tasks).
+
+Задачи получают id, а не объекты: к моменту выполнения пост или подписка
+могут быть удалены, тогда делать уже нечего.
+"""
+from core.tasks import task
+
+from . import thumbnails, timeline
+from .models import Follow, Post
+
+
+@task
+def generate_thumbnails(post_id):
+    """Строит миниатюры картинки поста."""
+    thumbnails.generate_variants(post_id)
+
+
+@task
+def fan_out_post(post_id):
+    """Добавляет новый пост в ленты подписчиков автора."""
+    post = Post.objects.filter(pk=post_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    if post is not None:
+        timeline.fan_out(post)
+
+
+@task
+def forget_post(author_id):
+    """Сбрасывает ленты подписчиков автора удалённого поста."""
+    timeline.forget(Post(author_id=author_id))
+
+
+@task
+def backfill_timeline(user_id, author_id):
+    """Переносит посты автора в ленту нового подписчика."""
+    follow = Follow.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).first()
+    if follow is not None:
+        timeline.backfill(follow)
+
+
+@task
+def backfill_followers(author_id):
+    """Раскладывает посты автора, переставшего быть популярным, по лентам."""
+    timeline.backfill_followers(author_id)
+
+
+@task
+def prune_timeline(user_id, author_id):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    # пользователь мог снова подписаться, пока задача ждала очереди
+    if Follow.objects.filter(user_id=user_id, author_id=author_id).exists():
+        return
+    timeline.prune(Follow(user_id=user_id, author_id=author_id))
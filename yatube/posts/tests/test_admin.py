@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.utils import EstimatedCountPaginator
+
+
+class AdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        start = User.objects.count()
+        users = [
+            User.objects.create_user(username=f'user{start + i}')
+            for i in range(count)
+        ]
+        for user in users:
+            post = Post.objects.create(
+                author=user, group=self.group, text='Пост'
+            )
+            Comment.objects.create(post=post, author=user, text='Коммент')
+            Follow.objects.create(user=user, author=self.admin)
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelists_do_not_query_per_row(self):
+        """Число запросов списка не зависит от числа строк"""
+        for model in ('post', 'comment', 'follow'):
+            url = reverse(f'admin:posts_{model}_changelist')
+            with self.subTest(model=model):
+                self.add_rows(2)
+                few = self.queries(url)
+                self.add_rows(5)
+                self.assertEqual(self.queries(url), few)
+
+    def test_post_changelist_does_not_list_all_groups(self):
+        """Группа в списке постов выбирается без выпадающего списка групп"""
+        Group.objects.create(
+            title='Другая группа', slug='other', description='Описание'
+        )
+        self.add_rows(1)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertNotContains(response, 'Другая группа')
+
+    def test_large_counts_are_estimated(self):
+        """Для больших выборок берётся оценка планировщика"""
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        with mock.patch(
+            'posts.counting.estimate_count', return_value=10 ** 7
+        ):
+            self.assertEqual(paginator.count, 10 ** 7)
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        with mock.patch('posts.counting.estimate_count', return_value=5):
+            self.assertEqual(paginator.count, 0)
@@ -0,0 +1,109 @@
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+
+
+class FeedAPITests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, text=f'Пост {num}', group=cls.group
+            )
+            for num in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def get_json(self, url, data=None, **extra):
+        response = self.client.get(url, data, **extra)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def test_cursor_pages_cover_feed(self):
+        """Страницы по курсору содержат все посты ленты по одному разу"""
+        self.client.force_login(self.reader)
+        for url in (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list', args=[self.group.slug]),
+            reverse('posts:api_profile', args=[self.author.username]),
+            reverse('posts:api_follow_index'),
+        ):
+            with self.subTest(url=url):
+                ids = []
+                data = {'limit': 2}
+                while True:
+                    response, page = self.get_json(url, data)
+                    self.assertEqual(
+                        response['Content-Type'], 'application/json'
+                    )
+                    ids += [post['id'] for post in page['results']]
+                    if page['next'] is None:
+                        break
+                    data['cursor'] = page['next']
+                self.assertEqual(
+                    ids, [post.pk for post in reversed(self.posts)]
+                )
+
+    def test_fields_selection(self):
+        _, page = self.get_json(
+            reverse('posts:api_index'), {'fields': 'id,author'}
+        )
+        self.assertEqual(
+            page['results'][0],
+            {'id': self.posts[-1].pk, 'author': 'author'}
+        )
+        response = self.client.get(
+            reverse('posts:api_index'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_etag_skips_feed_query(self):
+        """Неизменившаяся лента отдаётся ответом 304 без запросов к базе"""
+        url = reverse('posts:api_index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_follow_feed_requires_login(self):
+        response = self.client.get(reverse('posts:api_follow_index'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_follow_feed_is_private(self):
+        """Личную ленту не сохраняют общие кеши, ETag свой у читателя"""
+        url = reverse('posts:api_follow_index')
+        self.client.force_login(self.reader)
+        response, _ = self.get_json(url)
+        self.assertIn('private', response['Cache-Control'])
+        self.client.force_login(self.author)
+        other_response, _ = self.get_json(url)
+        self.assertNotEqual(other_response['ETag'], response['ETag'])
+
+    def test_post_detail(self):
+        post = self.posts[0]
+        url = reverse('posts:api_post_detail', args=[post.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.json()['text'], post.text)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            304
+        )
@@ -0,0 +1,35 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts import benchmark
+from posts.models import AuthorStats, Post, TimelineEntry
+
+
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_seed_and_run(self):
+        """Наполнение базы и прогон всех сценариев проходят без ошибок"""
+        benchmark.seed(users=5, groups=2, posts=30, comments=20, follows=8)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertEqual(AuthorStats.objects.count(), 5)
+        results = benchmark.run(iterations=2)
+        self.assertEqual(set(results), set(benchmark.SCENARIOS))
+        for name, result in results.items():
+            with self.subTest(scenario=name):
+                self.assertEqual(result['errors'], 0)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_run_with_template_cache(self):
+        """Замер с кешем шаблонов сообщает время их рендера"""
+        benchmark.seed(users=3, groups=1, posts=5, comments=2, follows=2)
+        for template_cache in (False, True):
+            with self.subTest(template_cache=template_cache):
+                cache.clear()
+                result = benchmark.run(
+                    ['index'], iterations=1, template_cache=template_cache
+                )['index']
+                self.assertEqual(result['errors'], 0)
+                self.assertGreater(result['render_mean_ms'], 0)
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts.cards import card_key, render_cards
+from posts.models import Group, Post, User
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_are_cached(self):
+        """Карточка поста рендерится один раз и берётся из кеша"""
+        card = render_cards([self.post])[0]
+        self.assertIn(self.post.text, card)
+        self.assertEqual(cache.get(card_key(self.post)), card)
+        with self.assertNumQueries(0):
+            self.assertEqual(render_cards([self.post]), [card])
+
+    def test_group_rename_invalidates_cards(self):
+        """Изменение группы даёт новую версию карточек её постов"""
+        render_cards([self.post])
+        self.group.title = 'Новое название'
+        self.group.save()
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertNotEqual(card_key(post), card_key(self.post))
+        self.assertIn('Новое название', render_cards([post])[0])
+
+    def test_login_does_not_invalidate_cards(self):
+        """Обновление last_login не меняет версию карточек автора"""
+        self.client.force_login(self.user)
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.updated, self.post.updated)
+
+    def test_password_change_does_not_invalidate_cards(self):
+        """Сохранение автора без изменения имени не меняет его карточки"""
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password')
+        user.save()
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual(post.updated, self.post.updated)
+
+    def test_author_rename_invalidates_cards(self):
+        """Новое имя автора даёт новую версию его карточек"""
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Лев'
+        user.save()
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertNotEqual(card_key(post), card_key(self.post))
@@ -0,0 +1,86 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Тестовый пост', group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_unchanged_feeds_return_304(self):
+        """Неизменившаяся лента отдаётся без запросов к базе и рендера"""
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('private', response['Cache-Control'])
+                self.assertIn('max-age=0', response['Cache-Control'])
+                with self.assertNumQueries(0):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, 304)
+
+    def test_feed_changes_invalidate_validators(self):
+        url = reverse('posts:index')
+        response = self.client.get(url)
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            200
+        )
+
+    def test_etag_depends_on_user(self):
+        url = reverse('posts:index')
+        etag = self.client.get(url)['ETag']
+        self.client.force_login(self.author)
+        self.assertNotEqual(self.client.get(url)['ETag'], etag)
+
+    def test_post_detail_follows_comments(self):
+        """Страница поста меняется с новым комментарием"""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        response = self.client.get(url)
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            ).status_code,
+            304
+        )
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        self.assertEqual(
+            self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag']
+            ).status_code,
+            200
+        )
+
+    def test_post_detail_follows_author_posts_count(self):
+        """Страница поста меняется, когда у автора появляется новый пост"""
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        etag = self.client.get(url)['ETag']
+        Post.objects.create(author=self.author, text='Ещё один пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Всего постов автора:  <span>2')
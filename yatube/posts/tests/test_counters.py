@@ -0,0 +1,96 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import AuthorStats, Comment, Follow, Post, User
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+
+    def stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_counters_follow_writes(self):
+        """Счётчики меняются при создании и удалении записей"""
+        post = Post.objects.create(author=self.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_drifted_counters_do_not_go_below_zero(self):
+        """Удаление при заниженных счётчиках не падает и не уходит в минус"""
+        post = Post.objects.create(author=self.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='Комментарий'
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        AuthorStats.objects.update(
+            posts_count=0, followers_count=0, following_count=0
+        )
+        Post.objects.update(comments_count=0)
+        comment.delete()
+        follow.delete()
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+
+    def test_recount_counters_command(self):
+        """Команда recount_counters восстанавливает разошедшиеся счётчики"""
+        Post.objects.bulk_create(
+            [Post(author=self.author, text=num) for num in range(3)]
+        )
+        AuthorStats.objects.filter(user=self.reader).delete()
+        call_command('recount_counters', stdout=StringIO())
+        self.assertEqual(self.stats(self.author).posts_count, 3)
+        self.assertEqual(self.stats(self.reader).posts_count, 0)
+
+    def test_profile_shows_counter(self):
+        """Число постов в профиле берётся из счётчика автора"""
+        Post.objects.create(author=self.author, text='Пост')
+        AuthorStats.objects.filter(user=self.author).update(posts_count=7)
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author])
+        )
+        self.assertContains(response, 'Всего постов: 7')
+
+    def test_follower_profile_shows_following_count(self):
+        """Профиль читателя обновляется после подписки и отписки"""
+        profile_url = reverse('posts:profile', args=[self.reader])
+        reader_client = Client()
+        reader_client.force_login(self.reader)
+        for client in (reader_client, self.client):
+            self.assertContains(client.get(profile_url), 'подписок: 0')
+        reader_client.get(reverse('posts:profile_follow', args=[self.author]))
+        for client in (reader_client, self.client):
+            with self.subTest(client=client):
+                self.assertContains(client.get(profile_url), 'подписок: 1')
+        reader_client.get(
+            reverse('posts:profile_unfollow', args=[self.author])
+        )
+        for client in (reader_client, self.client):
+            with self.subTest(client=client):
+                self.assertContains(client.get(profile_url), 'подписок: 0')
@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from posts import counting, timeline
+from posts.caching import bump_feeds
+from posts.models import Follow, Post, User
+
+
+class FeedCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Post.objects.bulk_create(
+            [Post(author=cls.author, text=num) for num in range(5)]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def count_queries(self, queryset, feed=None):
+        with CaptureQueriesContext(connection) as queries:
+            count = counting.feed_count(queryset, feed)
+        return count, [
+            query['sql'] for query in queries if 'COUNT(' in query['sql']
+        ]
+
+    @override_settings(FEED_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_large_feed_is_estimated(self):
+        """Большая лента после изменения считается по статистике"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(
+            self.count_queries(Post.objects.all(), 'index')[0], 5
+        )
+        bump_feeds('index')
+        self.assertEqual(
+            self.count_queries(Post.objects.all(), 'index'), (5, [])
+        )
+
+    @override_settings(FEED_COUNT_ESTIMATE_THRESHOLD=1)
+    def test_filtered_feed_without_estimate_is_exact(self):
+        posts = Post.objects.filter(author=self.author)
+        counting.feed_count(posts, 'profile:author')
+        bump_feeds('profile:author')
+        count, count_queries = self.count_queries(posts, 'profile:author')
+        self.assertEqual(count, 5)
+        self.assertEqual(len(count_queries), 1)
+
+    def test_follow_feed_count_follows_changes(self):
+        """Число постов ленты подписок сбрасывается при её изменении"""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        feed = timeline.timeline_feed(self.reader)
+        posts = timeline.timeline_posts(self.reader)
+        self.assertEqual(counting.feed_count(posts, feed), 5)
+        self.assertEqual(self.count_queries(posts, feed), (5, []))
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(counting.feed_count(posts, feed), 6)
+        post.delete()
+        self.assertEqual(counting.feed_count(posts, feed), 5)
+        follow.delete()
+        self.assertEqual(counting.feed_count(posts, feed), 0)
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts import follows
+from posts.models import Follow, User
+
+
+class FollowStateTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{i}') for i in range(5)
+        ]
+        Follow.objects.create(user=cls.reader, author=cls.authors[0])
+        Follow.objects.create(user=cls.reader, author=cls.authors[2])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def test_states_are_resolved_in_one_query(self):
+        """Подписки на всех авторов страницы читаются одним запросом"""
+        state = follows.FollowState(self.reader)
+        with self.assertNumQueries(1):
+            states = state.states(self.authors)
+        self.assertEqual(
+            [states[author.pk] for author in self.authors],
+            [True, False, True, False, False]
+        )
+        with self.assertNumQueries(0):
+            follows.FollowState(self.reader).states(self.authors)
+
+    def test_follow_and_unfollow_reset_cache(self):
+        """Подписка и отписка сбрасывают закешированные подписки"""
+        author = self.authors[1]
+        self.assertNotIn(author, follows.FollowState(self.reader))
+        self.client.get(reverse('posts:profile_follow', args=[author]))
+        self.assertIn(author, follows.FollowState(self.reader))
+        self.client.get(reverse('posts:profile_unfollow', args=[author]))
+        self.assertNotIn(author, follows.FollowState(self.reader))
+
+    def test_profile_shows_follow_state_of_current_user(self):
+        """Кнопка на профиле зависит от подписки текущего пользователя"""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=other, author=self.authors[1])
+        response = self.client.get(
+            reverse('posts:profile', args=[self.authors[1]])
+        )
+        self.assertFalse(response.context['following'])
+        response = self.client.get(
+            reverse('posts:profile', args=[self.authors[0]])
+        )
+        self.assertTrue(response.context['following'])
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.timeline import timeline_posts
+
+
+class FeedQueryPlanTests(TestCase):
+    """Запросы лент читают индекс в нужном порядке, без сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.post = Post.objects.create(
+            author=cls.author, text='Пост', group=cls.group
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def test_feed_queries_use_indexes(self):
+        page = slice(0, settings.NUM_POSTS_ON_PAGE)
+        queries = {
+            'index': (
+                Post.objects.select_related('author', 'group'),
+                'posts_post_pub_date'
+            ),
+            'group_list': (
+                self.group.posts.select_related('author'),
+                'post_group_pub_date_idx'
+            ),
+            'profile': (
+                Post.objects.select_related('author', 'group').filter(
+                    author=self.author
+                ),
+                'post_author_pub_date_idx'
+            ),
+            'follow_index': (
+                timeline_posts(self.reader).select_related('author', 'group'),
+                'timeline_user_pub_date_idx'
+            ),
+            'comments': (
+                self.post.comments.select_related('author'),
+                'comment_post_created_idx'
+            ),
+        }
+        for name, (queryset, index) in queries.items():
+            with self.subTest(query=name):
+                plan = queryset[page].explain()
+                self.assertIn(index, plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_follow_is_unique(self):
+        """Повторная подписка не создаёт вторую запись"""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.reader, author=self.author)
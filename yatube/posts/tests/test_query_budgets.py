@@ -0,0 +1,95 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.thumbnails import generate_variants
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class QueryBudgetTests(TestCase):
+    """Представления укладываются в бюджеты SQL-запросов QUERY_BUDGETS."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for num in range(settings.NUM_POSTS_ON_PAGE):
+            Post.objects.create(
+                author=cls.author, text=f'Пост {num}', group=cls.group
+            )
+        # самый свежий пост с картинкой и готовой миниатюрой попадает на
+        # первые страницы всех лент
+        image_post = Post.objects.create(
+            author=cls.author,
+            text='Пост с картинкой',
+            group=cls.group,
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            )
+        )
+        generate_variants(image_post.pk)
+        for num in range(5):
+            Comment.objects.create(
+                post=image_post,
+                author=User.objects.create_user(username=f'reader_{num}'),
+                text='Комментарий'
+            )
+        cls.urls = {
+            'posts:index': reverse('posts:index'),
+            'posts:group_list': reverse(
+                'posts:group_list', args=[cls.group.slug]
+            ),
+            'posts:profile': reverse('posts:profile', args=[cls.author]),
+            'posts:post_detail': reverse(
+                'posts:post_detail', args=[image_post.pk]
+            ),
+            'posts:follow_index': reverse('posts:follow_index'),
+        }
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_views_fit_query_budgets(self):
+        for view_name, url in self.urls.items():
+            with self.subTest(view_name=view_name):
+                cache.clear()
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(
+                    len(queries),
+                    settings.QUERY_BUDGETS[view_name],
+                    '\n'.join(query['sql'] for query in queries)
+                )
@@ -0,0 +1,98 @@
+from django.core.cache import cache
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts import search
+from posts.models import Post, User
+from posts.search import search_posts
+from posts.stemmer import stem
+
+
+class StemmerTests(TestCase):
+    def test_word_forms_share_stem(self):
+        for forms in (
+            ('книга', 'книги', 'книгами', 'книгу'),
+            ('красивый', 'красивая', 'красивыми'),
+            ('ёлка', 'елки'),
+        ):
+            with self.subTest(forms=forms):
+                self.assertEqual(len({stem(form) for form in forms}), 1)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Читаю интересные книги о путешествиях'
+        )
+        cls.other_post = Post.objects.create(
+            author=cls.user,
+            text='Книга про книгу, которая о книгах'
+        )
+        Post.objects.create(author=cls.user, text='Совсем другой текст')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_search_matches_word_forms(self):
+        """Поиск находит посты с другими формами слов"""
+        self.assertEqual(
+            set(search_posts('книгами')), {self.post, self.other_post}
+        )
+        self.assertEqual(
+            list(search_posts('интересная книга')), [self.post]
+        )
+
+    def test_more_relevant_posts_come_first(self):
+        self.assertEqual(list(search_posts('книга'))[0], self.other_post)
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при правке и удалении поста"""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Теперь о горах'
+        post.save()
+        self.assertEqual(list(search_posts('горы')), [post])
+        self.assertNotIn(post, search_posts('книги'))
+        post.delete()
+        self.assertFalse(search_posts('горы').exists())
+
+    @mock.patch('posts.search.REBUILD_BATCH_SIZE', 2)
+    def test_rebuild_indexes_all_posts_in_batches(self):
+        """Пересборка заполняет очищенный индекс пачками"""
+        search.get_backend().clear()
+        self.assertFalse(search_posts('книги').exists())
+        search.rebuild()
+        self.assertEqual(
+            set(search_posts('книги')), {self.post, self.other_post}
+        )
+        self.assertEqual(search_posts('другой').count(), 1)
+
+    def test_empty_query_finds_nothing(self):
+        self.assertFalse(search_posts(' ,. ').exists())
+
+    @override_settings(SEARCH_BACKEND='posts.search.SimpleBackend')
+    def test_simple_backend(self):
+        self.assertEqual(
+            set(search_posts('книги')), {self.post, self.other_post}
+        )
+
+    @override_settings(NUM_POSTS_ON_PAGE=1)
+    def test_search_view(self):
+        """Страница поиска выводит результаты и сохраняет запрос в ссылках"""
+        response = self.client.get(reverse('posts:search'), {'q': 'книги'})
+        self.assertEqual(response.context['query'], 'книги')
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+        self.assertContains(response, '?q=%D0%BA')
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        self.client.force_login(admin)
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'книгами'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 2)
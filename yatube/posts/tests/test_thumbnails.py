@@ -0,0 +1,61 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import ImageVariant, Post, User
+from posts.thumbnails import generate_variants
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            )
+        )
+
+    def test_feed_does_not_resize_images(self):
+        """Пока миниатюры нет, лента выводит исходную картинку"""
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, self.post.image.url)
+        self.assertFalse(ImageVariant.objects.exists())
+
+    def test_generated_variant_is_used(self):
+        """Готовая миниатюра выводится в ленте вместо исходной картинки"""
+        self.client.get(reverse('posts:index'))
+        generate_variants(self.post.pk)
+        variant = ImageVariant.objects.get(post=self.post, name='card')
+        self.assertEqual(variant.source, self.post.image.name)
+        self.assertEqual((variant.width, variant.height), (960, 339))
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, variant.url)
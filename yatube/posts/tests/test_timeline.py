@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Пост до подписки'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_follow_backfills_and_unfollow_prunes(self):
+        """Подписка переносит посты автора в ленту, отписка их убирает"""
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertIn(self.old_post, timeline.timeline_posts(self.reader))
+        follow.delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.reader).exists()
+        )
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков автора"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(
+            list(timeline.timeline_posts(self.reader))[0],
+            post
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_celebrity_posts_are_read_on_demand(self):
+        """Посты популярных авторов подмешиваются в ленту при чтении"""
+        Follow.objects.create(user=self.reader, author=self.author)
+        cache.clear()
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(
+            TimelineEntry.objects.filter(post=post).exists()
+        )
+        self.assertIn(post, timeline.timeline_posts(self.reader))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_author_leaving_celebrities_is_fanned_out(self):
+        """Посты бывшего популярного автора остаются в лентах подписчиков"""
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=other, author=self.author)
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertIn(self.author.pk, timeline.celebrity_ids())
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertIn(post, timeline.timeline_posts(self.reader))
+        Follow.objects.filter(user=other).delete()
+        self.assertNotIn(self.author.pk, timeline.celebrity_ids())
+        self.assertIn(post, timeline.timeline_posts(self.reader))
+        self.assertIn(self.old_post, timeline.timeline_posts(self.reader))
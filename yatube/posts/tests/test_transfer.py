@@ -0,0 +1,99 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import timeline
+from posts.models import Comment, Follow, Group, Post, User
+from posts.search import search_posts
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.old_date = datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        for num in range(3):
+            post = Post.objects.create(
+                author=cls.author,
+                text=f'Пост номер {num} о путешествиях',
+                group=cls.group if num else None
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text=f'Комментарий "{num}"'
+            )
+        Post.objects.update(pub_date=cls.old_date)
+        Comment.objects.update(created=cls.old_date)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def round_trip(self, fmt):
+        paths = {}
+        for model in ('posts', 'comments', 'follows'):
+            paths[model] = os.path.join(self.directory.name, f'{model}.{fmt}')
+            call_command(
+                'export_data', model, output=paths[model], format=fmt,
+                stderr=StringIO()
+            )
+        Post.objects.all().delete()
+        Follow.objects.all().delete()
+        User.objects.filter(username='reader').delete()
+        for model in ('posts', 'comments', 'follows'):
+            call_command(
+                'import_data', model, paths[model], format=fmt,
+                batch_size=2, no_rebuild=model != 'follows',
+                stdout=StringIO(), stderr=StringIO()
+            )
+
+    def check_restored(self):
+        self.assertEqual(Post.objects.count(), 3)
+        self.assertEqual(Comment.objects.count(), 3)
+        self.assertEqual(
+            set(Post.objects.values_list('pub_date', flat=True)),
+            {self.old_date}
+        )
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 2)
+        self.assertTrue(
+            Comment.objects.filter(text='Комментарий "1"').exists()
+        )
+        reader = User.objects.get(username='reader')
+        self.assertFalse(reader.has_usable_password())
+        self.assertEqual(reader.stats.following_count, 1)
+        self.assertEqual(
+            Post.objects.filter(comments_count=1).count(), 3
+        )
+        self.assertEqual(timeline.timeline_posts(reader).count(), 3)
+        self.assertEqual(search_posts('путешествие').count(), 3)
+
+    def test_ndjson_round_trip(self):
+        """Выгруженные данные загружаются обратно с теми же датами"""
+        self.round_trip('ndjson')
+        self.check_restored()
+
+    def test_csv_round_trip(self):
+        self.round_trip('csv')
+        self.check_restored()
+
+    def test_existing_records_are_skipped(self):
+        path = os.path.join(self.directory.name, 'posts.ndjson')
+        call_command('export_data', 'posts', output=path, stderr=StringIO())
+        call_command(
+            'import_data', 'posts', path,
+            stdout=StringIO(), stderr=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 3)
@@ -1,9 +1,13 @@
 from django.core.cache import cache
 from django.conf import settings
-from django.test import TestCase
+from django.core.paginator import Paginator
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Group, Post, User
+from posts.utils import ELLIPSIS, FeedPaginator, elided_page_range
 
 
 class PaginatorViewsTest(TestCase):
@@ -59,3 +63,102 @@ class PaginatorViewsTest(TestCase):
                     response.context['page_obj']),
                     self.NUM_POSTS_ON_PAGE_2
                 )
+
+
+@override_settings(CURSOR_PAGINATION_VIEWS=['posts:index'])
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.NUMBER_OF_POST = settings.NUM_POSTS_ON_PAGE * 2 + 3
+        Post.objects.bulk_create(
+            [
+                Post(author=cls.user, text=num)
+                for num in range(cls.NUMBER_OF_POST)
+            ]
+        )
+        cls.reverse_index = reverse('posts:index')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_cover_feed(self):
+        """Лента по курсору проходится вперёд и назад без пропусков"""
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        seen = []
+        pages = []
+        url = self.reverse_index
+        while True:
+            page_obj = self.client.get(url).context['page_obj']
+            pages.append(list(page_obj))
+            seen.extend(page_obj)
+            if not page_obj.has_next():
+                break
+            url = f'{self.reverse_index}?cursor={page_obj.next_cursor()}'
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages[-1]), 3)
+        previous = self.client.get(
+            f'{self.reverse_index}?cursor={page_obj.previous_cursor()}'
+        ).context['page_obj']
+        self.assertEqual(list(previous), pages[-2])
+
+    def test_cursor_page_has_no_count_query(self):
+        """Страница по курсору не выполняет COUNT(*)"""
+        first = self.client.get(self.reverse_index).context['page_obj']
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                f'{self.reverse_index}?cursor={first.next_cursor()}'
+            )
+        self.assertFalse(
+            [q for q in queries if 'COUNT(' in q['sql'].upper()]
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Некорректный курсор открывает первую страницу"""
+        response = self.client.get(f'{self.reverse_index}?cursor=broken')
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+
+class ElidedPageRangeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        Post.objects.bulk_create(
+            [
+                Post(author=cls.user, text=num)
+                for num in range(settings.NUM_POSTS_ON_PAGE * 30)
+            ]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_range_is_bounded(self):
+        """Навигация содержит края и соседей текущей страницы."""
+        response = self.client.get(reverse('posts:index') + '?page=15')
+        self.assertEqual(
+            response.context['page_obj'].elided_page_range,
+            [1, ELLIPSIS, 13, 14, 15, 16, 17, ELLIPSIS, 30]
+        )
+        self.assertNotContains(response, '?page=20"')
+
+    def test_short_page_range_is_not_elided(self):
+        paginator = Paginator(range(5), 1)
+        self.assertEqual(
+            list(elided_page_range(paginator.page(3))), [1, 2, 3, 4, 5]
+        )
+
+    def test_feed_count_is_cached(self):
+        """Число постов ленты считается один раз до её изменения."""
+        paginator = FeedPaginator(Post.objects.all(), 10, feed='index')
+        self.assertEqual(paginator.count, Post.objects.count())
+        count = paginator.count
+        with CaptureQueriesContext(connection) as queries:
+            paginator = FeedPaginator(Post.objects.all(), 10, feed='index')
+            self.assertEqual(paginator.count, count)
+        self.assertEqual(len(queries), 0)
+        Post.objects.create(author=self.user, text='Новый пост')
+        paginator = FeedPaginator(Post.objects.all(), 10, feed='index')
+        self.assertEqual(paginator.count, Post.objects.count())
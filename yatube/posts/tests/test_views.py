@@ -5,7 +5,9 @@ from django.conf import settings
 from django import forms
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import Client, override_settings, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Comment, Follow, Group, Post, User
@@ -225,19 +227,99 @@ class PostPagesTests(TestCase):
             response.context['comments']
         )
 
+    def test_post_detail_queries_do_not_depend_on_comments(self):
+        """Число запросов post_detail не растёт с числом комментариев"""
+        url, = self.reverse_template_post_detail.keys()
+        with CaptureQueriesContext(connection) as single_comment:
+            self.client.get(url)
+        for num in range(5):
+            Comment.objects.create(
+                post=self.post,
+                author=User.objects.create_user(username=f'reader_{num}'),
+                text='Ещё комментарий'
+            )
+        with CaptureQueriesContext(connection) as many_comments:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['comments']), 6)
+        self.assertEqual(len(many_comments), len(single_comment))
+
+    @override_settings(NUM_COMMENTS_ON_PAGE=1)
+    def test_post_detail_comments_are_paginated(self):
+        """Комментарии поста выводятся постранично"""
+        url, = self.reverse_template_post_detail.keys()
+        Comment.objects.create(
+            post=self.post, author=self.auth, text='Новый комментарий 2'
+        )
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['comments']), 1)
+        self.assertContains(response, '?comments_page=2')
+        response = self.client.get(url + '?comments_page=2')
+        self.assertIn(self.comment, response.context['comments'])
+
     def test_cache(self):
         """Проверяет работу кеша"""
         response_1 = self.client.get(self.reverse_index)
+        with self.assertNumQueries(0):
+            response_2 = self.client.get(self.reverse_index)
+        self.assertEqual(response_1.content, response_2.content)
         self.post_2 = Post.objects.create(
             author=self.auth,
             text='Тестовый пост 2',
             group=self.group,
         )
-        response_2 = self.client.get(self.reverse_index)
-        self.assertEqual(response_1.content, response_2.content)
-        cache.clear()
         response_3 = self.client.get(self.reverse_index)
         self.assertNotEqual(response_1.content, response_3.content)
+        self.assertIn(self.post_2, response_3.context['page_obj'])
+
+    def test_cache_invalidated_by_changes(self):
+        """Кеш лент сбрасывается при изменении постов, групп и подписок"""
+        group_url, profile_url = list(self.reverse_template_posts)[1:3]
+        cached_unrelated = self.client.get(self.reverse_name_group_2).content
+        self.client.get(group_url)
+        self.client.get(profile_url)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Изменённый текст'
+        post.save()
+        for reverse_name in (group_url, profile_url):
+            with self.subTest(reverse_name=reverse_name):
+                response = self.client.get(reverse_name)
+                self.assertContains(response, 'Изменённый текст')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.reverse_name_group_2)
+        self.assertEqual(response.content, cached_unrelated)
+        self.authorized_client.get(profile_url)
+        self.authorized_client.get(self.reverse_profile_follow)
+        response = self.authorized_client.get(profile_url)
+        self.assertTrue(response.context['following'])
+
+    def test_follow_button_belongs_to_viewer(self):
+        """После подписки одного пользователя другой видит «Подписаться»"""
+        profile_url = list(self.reverse_template_posts)[2]
+        other_client = Client()
+        other_client.force_login(User.objects.create_user(username='other'))
+        other_client.get(profile_url)
+        self.authorized_client.get(self.reverse_profile_follow)
+        self.assertContains(
+            self.authorized_client.get(profile_url), 'Отписаться'
+        )
+        response = other_client.get(profile_url)
+        self.assertContains(response, 'Подписаться')
+        self.assertNotContains(response, 'Отписаться')
+
+    def test_cached_feeds_are_not_shared_between_users(self):
+        """Закешированная лента не отдаёт шапку другого пользователя"""
+        group_url, profile_url = list(self.reverse_template_posts)[1:3]
+        for url in (group_url, profile_url):
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.authorized_client.get(url),
+                    f'Пользователь: {self.user.username}'
+                )
+                self.assertContains(
+                    self.authorized_author.get(url),
+                    f'Пользователь: {self.auth.username}'
+                )
+                self.assertNotContains(self.client.get(url), 'Пользователь:')
 
     def test_authorized_user_following_authors(self):
         """"Авторизованный пользователь может подписываться на других
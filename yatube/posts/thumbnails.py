@@ -0,0 +1,56 @@
+"""Подготовка миниатюр картинок постов вне обработки запроса.
+
+Миниатюры из POST_IMAGE_VARIANTS строятся фоновой задачей (см. core.tasks)
+после коммита транзакции, в которой пост сохранён с новой картинкой, и
+записываются в ImageVariant. Шаблоны только читают готовые адреса.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import get_thumbnail
+
+from .caching import bump_feeds, post_feeds
+from .cards import touch_posts
+from .models import ImageVariant, Post
+
+logger = logging.getLogger(__name__)
+
+
+def generate_variants(post_id):
+    """Строит все варианты миниатюр картинки поста."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    if not post.image.storage.exists(post.image.name):
+        logger.warning('Картинка поста %s не найдена', post_id)
+        return
+    for name, options in settings.POST_IMAGE_VARIANTS.items():
+        options = dict(options)
+        thumbnail = get_thumbnail(
+            post.image, options.pop('geometry'), **options
+        )
+        ImageVariant.objects.update_or_create(
+            post=post,
+            name=name,
+            defaults={
+                'source': post.image.name,
+                'url': thumbnail.url,
+                'width': thumbnail.width,
+                'height': thumbnail.height,
+            }
+        )
+    # карточки и страницы лент, собранные с исходной картинкой, устарели
+    touch_posts(Post.objects.filter(pk=post.pk))
+    bump_feeds(*post_feeds(post, post.group and post.group.slug))
+
+
+def schedule_variants(post):
+    """Ставит построение миниатюр в очередь после коммита.
+
+    До коммита файл картинки и пост могут быть не видны задаче.
+    """
+    from .tasks import generate_thumbnails
+
+    post_id = post.pk
+    transaction.on_commit(lambda: generate_thumbnails.delay(post_id))
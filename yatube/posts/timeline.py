@@ -0,0 +1,191 @@
+"""Материализованная лента подписок.
+
+Новый пост раскладывается в TimelineEntry каждого подписчика автора
+(fan-out-on-write), поэтому лента пользователя читается одним диапазонным
+запросом по индексу (user, -pub_date). Посты авторов, у которых больше
+TIMELINE_FANOUT_LIMIT подписчиков, не раскладываются, а подмешиваются
+при чтении (fan-out-on-read). Такие авторы отмечены в
+AuthorStats.is_celebrity; когда автор теряет подписчиков и перестаёт быть
+популярным, его посты раскладываются по лентам всех подписчиков.
+
+Лента подписок пользователя — это лента 'follow:<id>' в posts.caching:
+её поколение меняется, когда в ней появляются или пропадают посты.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .caching import ALL_FEEDS, bump_feeds
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+CELEBRITIES_CACHE_KEY = 'timeline:celebrities'
+
+
+def celebrity_ids():
+    """Авторы, посты которых не раскладываются по лентам подписчиков."""
+    ids = cache.get(CELEBRITIES_CACHE_KEY)
+    if ids is None:
+        ids = set(
+            AuthorStats.objects.filter(is_celebrity=True).values_list(
+                'user_id', flat=True
+            )
+        )
+        cache.set(
+            CELEBRITIES_CACHE_KEY, ids, settings.TIMELINE_CELEBRITIES_TIMEOUT
+        )
+    return ids
+
+
+def update_celebrity(author_id):
+    """Сверяет признак популярности автора с числом его подписчиков.
+
+    Возвращает True, если автор перестал быть популярным: тогда его посты
+    нужно разложить по лентам подписчиков (backfill_followers).
+    """
+    stats = AuthorStats.objects.filter(user_id=author_id).values_list(
+        'followers_count', 'is_celebrity'
+    ).first()
+    if stats is None:
+        return False
+    followers, was_celebrity = stats
+    is_celebrity = followers > settings.TIMELINE_FANOUT_LIMIT
+    if is_celebrity == was_celebrity:
+        return False
+    AuthorStats.objects.filter(user_id=author_id).update(
+        is_celebrity=is_celebrity
+    )
+    cache.delete(CELEBRITIES_CACHE_KEY)
+    return was_celebrity
+
+
+def sync_celebrities():
+    """Пересчитывает признаки популярности по счётчикам подписчиков.
+
+    Авторы, переставшие быть популярными, раскладываются по лентам.
+    """
+    limit = settings.TIMELINE_FANOUT_LIMIT
+    left = list(
+        AuthorStats.objects.filter(
+            is_celebrity=True, followers_count__lte=limit
+        ).values_list('user_id', flat=True)
+    )
+    AuthorStats.objects.filter(user_id__in=left).update(is_celebrity=False)
+    AuthorStats.objects.filter(
+        is_celebrity=False, followers_count__gt=limit
+    ).update(is_celebrity=True)
+    cache.delete(CELEBRITIES_CACHE_KEY)
+    for author_id in left:
+        backfill_followers(author_id)
+
+
+def fan_out(post):
+    """Добавляет пост в ленты подписчиков автора."""
+    if post.author_id in celebrity_ids():
+        return
+    followers = list(
+        Follow.objects.filter(
+            author_id=post.author_id
+        ).values_list('user_id', flat=True)
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers
+        ],
+        ignore_conflicts=True
+    )
+    bump_feeds(*map(follow_feed, followers))
+
+
+def forget(post):
+    """Сбрасывает ленты подписчиков автора удалённого поста."""
+    if post.author_id in celebrity_ids():
+        return
+    bump_feeds(*map(follow_feed, Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)))
+
+
+def backfill(follow):
+    """Переносит последние посты автора в ленту нового подписчика."""
+    if follow.author_id in celebrity_ids():
+        return
+    posts = Post.objects.filter(
+        author_id=follow.author_id
+    ).values_list('pk', 'pub_date')[:settings.TIMELINE_BACKFILL]
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=follow.user_id, post_id=pk, pub_date=date)
+            for pk, date in posts
+        ],
+        ignore_conflicts=True
+    )
+    bump_feeds(follow_feed(follow.user_id))
+
+
+def backfill_followers(author_id):
+    """Переносит посты автора в ленты всех его подписчиков."""
+    for follow in Follow.objects.filter(author_id=author_id).iterator():
+        backfill(follow)
+
+
+def prune(follow):
+    """Убирает посты автора из ленты отписавшегося пользователя."""
+    TimelineEntry.objects.filter(
+        user_id=follow.user_id,
+        post__author_id=follow.author_id
+    ).delete()
+    bump_feeds(follow_feed(follow.user_id))
+
+
+def follow_feed(user_id):
+    return f'follow:{user_id}'
+
+
+def followed_celebrities(user):
+    celebrities = celebrity_ids()
+    if not celebrities:
+        return []
+    return list(
+        Follow.objects.filter(
+            user=user, author_id__in=celebrities
+        ).values_list('author_id', flat=True)
+    )
+
+
+def timeline_feed(user):
+    """Имя ленты подписок для кеширования или None.
+
+    Посты популярных авторов подмешиваются при чтении и не меняют
+    поколение ленты, поэтому такую ленту кешировать нельзя.
+    """
+    if followed_celebrities(user):
+        return None
+    return follow_feed(user.pk)
+
+
+def timeline_posts(user):
+    """Посты ленты подписок пользователя, новые первыми."""
+    celebrities = followed_celebrities(user)
+    if not celebrities:
+        return Post.objects.filter(
+            timeline_entries__user=user
+        ).order_by('-timeline_entries__pub_date')
+    return Post.objects.filter(
+        Q(pk__in=TimelineEntry.objects.filter(user=user).values('post'))
+        | Q(author_id__in=celebrities)
+    )
+
+
+def rebuild(users=None):
+    """Пересобирает ленты пользователей (всех, если users не задан)."""
+    follows = Follow.objects.all()
+    entries = TimelineEntry.objects.all()
+    if users is not None:
+        follows = follows.filter(user__in=users)
+        entries = entries.filter(user__in=users)
+    sync_celebrities()
+    entries.delete()
+    for follow in follows.iterator():
+        backfill(follow)
+    bump_feeds(ALL_FEEDS)
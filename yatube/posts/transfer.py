@@ -0,0 +1,256 @@
+"""Выгрузка и загрузка постов, комментариев и подписок (NDJSON и CSV).
+
+Записи читаются и пишутся потоком, по одной строке, поэтому память не
+зависит от размера файла. Загрузка идёт пачками через bulk_create: сигналы
+моделей не срабатывают, а даты из файла сохраняются как есть. После
+загрузки счётчики, ленты подписок и поисковый индекс пересобираются
+целиком (finish_import).
+
+Пользователи и группы указываются по username и slug; недостающие
+создаются (пользователи — без пароля). Посты сохраняют id, чтобы на них
+могли ссылаться комментарии; уже существующие записи пропускаются.
+"""
+import csv
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.utils.dateparse import parse_datetime
+
+from . import counters, search, timeline
+from .caching import ALL_FEEDS, bump_feeds
+from .models import Comment, Follow, Group, Post, User
+
+FORMATS = ('ndjson', 'csv')
+
+
+def isoformat(value):
+    return value.isoformat()
+
+
+def parse_date(value):
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    return date
+
+
+class Spec:
+    """Описание выгружаемой модели.
+
+    ``fields`` — пары (имя в файле, поле для values_list), ``dates`` —
+    поля с датами, ``users`` и ``groups`` — поля со ссылками по username
+    и slug.
+    """
+
+    def __init__(self, model, fields, dates=(), users=(), groups=()):
+        self.model = model
+        self.fields = fields
+        self.dates = dates
+        self.users = users
+        self.groups = groups
+
+    @property
+    def names(self):
+        return [name for name, _ in self.fields]
+
+
+SPECS = {
+    'posts': Spec(
+        Post,
+        (
+            ('id', 'pk'),
+            ('text', 'text'),
+            ('pub_date', 'pub_date'),
+            ('author', 'author__username'),
+            ('group', 'group__slug'),
+            ('image', 'image'),
+        ),
+        dates=('pub_date',),
+        users=('author',),
+        groups=('group',),
+    ),
+    'comments': Spec(
+        Comment,
+        (
+            ('id', 'pk'),
+            ('post', 'post_id'),
+            ('author', 'author__username'),
+            ('text', 'text'),
+            ('created', 'created'),
+        ),
+        dates=('created',),
+        users=('author',),
+    ),
+    'follows': Spec(
+        Follow,
+        (
+            ('user', 'user__username'),
+            ('author', 'author__username'),
+        ),
+        users=('user', 'author'),
+    ),
+}
+
+
+def export_rows(spec):
+    """Записи модели в виде словарей, по мере чтения из базы."""
+    rows = spec.model.objects.order_by('pk').values_list(
+        *(field for _, field in spec.fields)
+    )
+    for row in rows.iterator():
+        record = dict(zip(spec.names, row))
+        for name in spec.dates:
+            record[name] = isoformat(record[name])
+        yield record
+
+
+def write_records(records, stream, fmt, names):
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=names)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+        def write(record):
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+    for count, record in enumerate(records, 1):
+        write(record)
+        yield count
+
+
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        for record in csv.DictReader(stream):
+            # в CSV нет null, пустая строка означает отсутствие значения
+            yield {
+                name: value if value != '' else None
+                for name, value in record.items()
+            }
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+@contextmanager
+def original_dates(model, names):
+    """Отключает auto_now и auto_now_add у полей ``names``.
+
+    Так сохраняются даты из файла, а поля, которых в файле нет,
+    заполняются как обычно.
+    """
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def resolve_users(usernames):
+    """id пользователей по username, недостающие создаются."""
+    ids = dict(
+        User.objects.filter(username__in=usernames).values_list(
+            'username', 'pk'
+        )
+    )
+    missing = set(usernames) - ids.keys()
+    if missing:
+        password = make_password(None)
+        User.objects.bulk_create(
+            [User(username=name, password=password) for name in missing],
+            ignore_conflicts=True
+        )
+        ids.update(
+            User.objects.filter(username__in=missing).values_list(
+                'username', 'pk'
+            )
+        )
+    return ids
+
+
+def resolve_groups(slugs):
+    """id групп по slug, недостающие создаются."""
+    ids = dict(
+        Group.objects.filter(slug__in=slugs).values_list('slug', 'pk')
+    )
+    missing = set(slugs) - ids.keys()
+    if missing:
+        Group.objects.bulk_create(
+            [
+                Group(title=slug, slug=slug, description='')
+                for slug in missing
+            ],
+            ignore_conflicts=True
+        )
+        ids.update(
+            Group.objects.filter(slug__in=missing).values_list('slug', 'pk')
+        )
+    return ids
+
+
+def build_objects(spec, records):
+    """Объекты модели из пачки записей файла."""
+    users = resolve_users({
+        record[name] for record in records for name in spec.users
+    })
+    groups = resolve_groups({
+        record[name] for record in records for name in spec.groups
+        if record[name]
+    })
+    objects = []
+    for record in records:
+        values = {}
+        for name, field in spec.fields:
+            value = record.get(name)
+            if name in spec.users:
+                values[f'{name}_id'] = users[value]
+            elif name in spec.groups:
+                values[f'{name}_id'] = value and groups[value]
+            elif name in spec.dates:
+                values[name] = parse_date(value)
+            elif field == 'post_id':
+                values['post_id'] = int(value)
+            elif field == 'pk':
+                values['pk'] = int(value) if value else None
+            else:
+                values[name] = value or ''
+        objects.append(spec.model(**values))
+    return objects
+
+
+def import_records(spec, records, batch_size):
+    """Загружает записи пачками, возвращая число обработанных записей."""
+    records = iter(records)
+    count = 0
+    with original_dates(spec.model, spec.dates):
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            spec.model.objects.bulk_create(
+                build_objects(spec, batch), ignore_conflicts=True
+            )
+            count += len(batch)
+            yield count
+
+
+def finish_import():
+    """Пересобирает данные, которые при загрузке обновляют сигналы."""
+    # id постов и комментариев взяты из файла, последовательности
+    # (в PostgreSQL) продолжаются после них
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), [Post, Comment]
+        ):
+            cursor.execute(sql)
+    counters.recount()
+    timeline.rebuild()
+    search.rebuild()
+    bump_feeds(ALL_FEEDS)
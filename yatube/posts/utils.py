@@ -1,9 +1,209 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
 from django.conf import settings
 from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .counting import feed_count, large_count
+
+CURSOR_PARAM = 'cursor'
+ELLIPSIS = '…'
 
 
-def page_num(request, posts):
-    paginator = Paginator(posts, settings.NUM_POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
+def page_num(request, posts, cursor=None, per_page=None,
+             page_param='page', count=None, feed=None):
+    """Возвращает страницу ленты.
+
+    Постраничная навигация по курсору включается явно аргументом
+    ``cursor`` или для представлений из CURSOR_PAGINATION_VIEWS.
+    Известное заранее число записей (``count``, например из счётчика)
+    избавляет от запроса COUNT(*), а для ленты ``feed`` число записей
+    кешируется до её изменения.
+    """
+    per_page = per_page or settings.NUM_POSTS_ON_PAGE
+    if cursor is None:
+        match = getattr(request, 'resolver_match', None)
+        cursor = (
+            match is not None
+            and match.view_name in settings.CURSOR_PAGINATION_VIEWS
+        )
+    if cursor:
+        paginator = CursorPaginator(posts, per_page)
+        return paginator.get_page(request.GET.get(CURSOR_PARAM))
+    paginator = FeedPaginator(posts, per_page, feed=feed)
+    if count is not None:
+        paginator.count = count
+    page_number = request.GET.get(page_param)
     page_obj = paginator.get_page(page_number)
+    page_obj.elided_page_range = list(elided_page_range(page_obj))
     return page_obj
+
+
+def elided_page_range(page_obj, on_each_side=2, on_ends=1):
+    """Номера страниц вокруг текущей и по краям, с пропусками между ними.
+
+    Число ссылок в навигации не зависит от числа страниц.
+    """
+    number = page_obj.number
+    num_pages = page_obj.paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from page_obj.paginator.page_range
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+class FeedPaginator(Paginator):
+    """Paginator, который берёт число записей из posts.counting.
+
+    Число записей ленты ``feed`` кешируется до её изменения, а для
+    больших выборок заменяется оценкой планировщика.
+    """
+
+    ELLIPSIS = ELLIPSIS
+
+    def __init__(self, object_list, per_page, feed=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        return feed_count(self.object_list, self.feed)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator, который для больших выборок берёт оценку планировщика.
+
+    Число записей не кешируется, поэтому подходит для выборок с
+    произвольными фильтрами, например в админке.
+    """
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        return large_count(self.object_list)
+
+
+class CursorPage(Sequence):
+    """Страница ленты, полученная по курсору (без общего числа записей)."""
+    cursor_based = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Cursor page of %s items>' % len(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return self.paginator.encode_cursor('n', self.object_list[-1])
+
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return self.paginator.encode_cursor('p', self.object_list[0])
+
+
+class CursorPaginator:
+    """Постраничная навигация по ключу (pub_date, id).
+
+    В отличие от Paginator не выполняет COUNT(*) и OFFSET: каждая страница
+    выбирается диапазонным запросом от последней показанной записи,
+    поэтому страница N стоит столько же, сколько первая.
+    """
+    ordering = ('-pub_date', '-pk')
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    @staticmethod
+    def encode_cursor(direction, obj):
+        raw = f'{direction}|{obj.pub_date.isoformat()}|{obj.pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Возвращает (направление, pub_date, pk) или None."""
+        if not cursor:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            ).decode()
+            direction, pub_date, pk = raw.split('|')
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        if direction not in ('n', 'p') or pub_date is None:
+            return None
+        return direction, pub_date, pk
+
+    def get_page(self, cursor):
+        """Возвращает страницу после (или до) курсора.
+
+        Некорректный курсор, как и в Paginator.get_page, даёт первую
+        страницу.
+        """
+        decoded = self.decode_cursor(cursor)
+        limit = self.per_page + 1
+        if decoded is None:
+            items = list(self.object_list.order_by(*self.ordering)[:limit])
+            return CursorPage(
+                items[:self.per_page], self, len(items) > self.per_page, False
+            )
+        direction, pub_date, pk = decoded
+        if direction == 'n':
+            items = list(self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            ).order_by(*self.ordering)[:limit])
+            if not items:
+                return self.get_page(None)
+            return CursorPage(
+                items[:self.per_page], self, len(items) > self.per_page, True
+            )
+        items = list(self.object_list.filter(
+            Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+        ).order_by('pub_date', 'pk')[:limit])
+        if not items:
+            return self.get_page(None)
+        has_previous = len(items) > self.per_page
+        items = items[:self.per_page][::-1]
+        return CursorPage(items, self, True, has_previous)
@@ -1,51 +1,78 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.utils.http import urlencode
 
+from . import feeds, follows
+from .caching import cache_feed
+from .conditional import conditional_feed, conditional_post
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .search import search_posts
 from .utils import page_num
 
 
-@cache_page(20, key_prefix='index_page')
+@conditional_feed('index')
+@cache_feed('index')
 def index(request):
-    post_list = Post.objects.select_related('author', 'group')
+    post_list = feeds.index_posts()
     return render(
         request,
         'posts/index.html',
-        {'page_obj': page_num(request, post_list)}
+        {'page_obj': page_num(request, post_list, feed='index')}
     )
 
 
+@conditional_feed('group:{slug}')
+@cache_feed('group:{slug}')
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.select_related('author')
+    post_list = feeds.group_posts(group)
     return render(
         request,
         'posts/group_list.html',
-        {'group': group, 'page_obj': page_num(request, post_list)}
+        {'group': group,
+         'page_obj': page_num(request, post_list, feed=f'group:{slug}')}
     )
 
 
+@conditional_feed('profile:{username}')
+@cache_feed('profile:{username}')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    following = Follow.objects.filter(author=author)
-    posts = Post.objects.select_related(
-        'author',
-        'group'
-    ).filter(author__username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
+    )
+    following = author in follows.for_request(request)
+    posts = feeds.profile_posts(author)
     return render(
         request,
         'posts/profile.html',
-        {'page_obj': page_num(request, posts),
+        {'page_obj': page_num(request, posts, feed=f'profile:{username}'),
          'author': author,
          'following': following}
     )
 
 
+@conditional_post()
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'),
+        pk=post_id
+    )
+    if post.image:
+        # миниатюра для includes/post_image.html
+        prefetch_related_objects([post], 'image_variants')
+    comments = page_num(
+        request,
+        post.comments.select_related('author'),
+        cursor=False,
+        per_page=settings.NUM_COMMENTS_ON_PAGE,
+        page_param='comments_page',
+        count=post.comments_count
+    )
     return render(
         request,
         'posts/post_detail.html',
@@ -55,6 +82,7 @@ def post_detail(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -95,6 +123,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -106,19 +135,32 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post.id)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    post_list = search_posts(query).select_related('author', 'group')
+    return render(
+        request,
+        'posts/search.html',
+        {'query': query,
+         'page_obj': page_num(request, post_list, cursor=False),
+         'page_params': urlencode({'q': query}) + '&'}
+    )
+
+
 @login_required
 def follow_index(request):
-    post_list = Post.objects.select_related(
-        'author'
-    ).filter(author__following__user=request.user)
+    post_list = feeds.follow_posts(request.user)
     return render(
         request,
         'posts/follow.html',
-        {'page_obj': page_num(request, post_list)}
+        {'page_obj': page_num(
+            request, post_list, feed=feeds.follow_feed(request.user)
+        )}
     )
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
@@ -127,8 +169,12 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username
+    )
     following = Follow.objects.filter(author=author, user=request.user)
     following.delete()
     return redirect('posts:profile', author.username)
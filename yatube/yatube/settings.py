@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 
 import os
 
+from core.cache import cache_settings
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -49,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -60,12 +64,24 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 
+# С TEMPLATE_CACHE (по умолчанию — вне DEBUG) скомпилированные шаблоны
+# хранятся в памяти процесса и не читаются с диска на каждый запрос;
+# при запуске через WSGI они компилируются заранее (см. core.template)
+TEMPLATE_CACHE = os.getenv('TEMPLATE_CACHE', '0' if DEBUG else '1') == '1'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': (
+                [('django.template.loaders.cached.Loader', TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE else TEMPLATE_LOADERS
+            ),
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -83,13 +99,58 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Соединения переиспользуются между запросами DB_CONN_MAX_AGE секунд
+# (0 — закрываются после каждого запроса), см. core.db
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+DB_HEALTH_CHECK_INTERVAL = int(os.getenv('DB_HEALTH_CHECK_INTERVAL', 30))
+DB_MAX_PERSISTENT_CONNECTIONS = int(
+    os.getenv('DB_MAX_PERSISTENT_CONNECTIONS', 10)
+)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
     }
 }
 
+# Реплики для чтения лент (см. core.routers): пути к файлам SQLite через
+# запятую, например копии основной базы для локальной проверки
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.getenv('REPLICA_DATABASES', '').split(',')), 1
+):
+    alias = f'replica_{number}'
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name,
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+    'posts:search',
+    'posts:api_index',
+    'posts:api_post_detail',
+    'posts:api_group_list',
+    'posts:api_profile',
+    'posts:api_follow_index',
+)
+
+# После запроса на запись браузер читает из основной базы, пока реплики
+# догоняют её
+REPLICA_PIN_COOKIE = 'read_primary'
+REPLICA_PIN_SECONDS = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -131,8 +192,67 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+# collectstatic добавляет к именам хеш содержимого и пишет сжатые копии
+# (см. core.storage); такие файлы кешируются браузером на год
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_HASHED_MAX_AGE = 60 * 60 * 24 * 365
+
+# Отдавать собранную статику из Django (core.views.static_file), если её
+# не отдаёт веб-сервер перед приложением
+STATIC_SERVE = os.getenv('STATIC_SERVE', '1') == '1'
+
 NUM_POSTS_ON_PAGE = 10
 
+NUM_COMMENTS_ON_PAGE = 20
+
+# Представления (view_name), где лента листается по курсору, без COUNT(*)
+CURSOR_PAGINATION_VIEWS = []
+
+# Лента подписок: авторы с большим числом подписчиков подмешиваются при чтении
+TIMELINE_FANOUT_LIMIT = 1000
+TIMELINE_CELEBRITIES_TIMEOUT = 60 * 10
+# Сколько последних постов автора попадает в ленту при подписке
+TIMELINE_BACKFILL = 1000
+
+# Сколько живут в кеше подписки пользователя (см. posts.follows)
+FOLLOWS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Время жизни отрендеренной карточки поста в кеше
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Миниатюры картинок строятся фоновой задачей после сохранения поста
+# (см. posts.thumbnails)
+POST_IMAGE_VARIANTS = {
+    'card': {'geometry': '960x339', 'crop': 'center', 'upscale': True},
+}
+
+# Фоновые задачи (см. core.tasks): sync — сразу в запросе, thread — в пуле
+# из TASKS_WORKERS потоков процесса, db — через очередь в базе и команду
+# run_tasks. С sync миниатюры картинок строятся внутри запроса, который
+# сохраняет пост, поэтому sync по умолчанию только при DEBUG
+TASKS_BACKEND = os.getenv('TASKS_BACKEND', 'sync' if DEBUG else 'thread')
+TASKS_WORKERS = int(os.getenv('TASKS_WORKERS', 4))
+TASKS_RETRIES = 3
+TASKS_RETRY_DELAY = 5
+# Через сколько секунд задача, взятая упавшим воркером, выполняется снова
+TASKS_LOCK_TIMEOUT = 60 * 10
+
+# Страницы лент живут в кеше до изменения данных, но не дольше суток
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Лента, в которой по оценке планировщика больше постов, не пересчитывается
+# через COUNT(*), см. posts.counting
+FEED_COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Бэкенд полнотекстового поиска (см. posts.search). FTS5Backend работает
+# только с SQLite, для других баз — posts.search.SimpleBackend
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'posts.search.FTS5Backend')
+
+# Наибольший размер страницы JSON API (posts.api)
+API_MAX_PAGE_SIZE = 100
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -146,10 +266,40 @@ NUM_POST_LETTERS = 15
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
-}
+# Кто передаёт клиенту файлы из MEDIA_ROOT после проверки доступа
+# (см. core.views.media_file): accel — nginx по X-Accel-Redirect на
+# внутренний location MEDIA_ACCEL_PREFIX, sendfile — веб-сервер по
+# X-Sendfile, django — сам Django
+MEDIA_SERVE = os.getenv('MEDIA_SERVE', 'django')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+# Каталоги MEDIA_ROOT, открытые всем: картинки постов и их миниатюры
+MEDIA_PUBLIC_DIRS = ('posts/', 'cache/')
+MEDIA_MAX_AGE = 60 * 60 * 24
+
+# Общий для всех процессов кеш задаётся через CACHE_URL (см. core/cache.py)
+CACHES = cache_settings(
+    os.getenv('CACHE_URL', 'locmem://'),
+    local_timeout=int(os.getenv('CACHE_LOCAL_TIMEOUT', 5)),
+    max_connections=os.getenv('CACHE_MAX_CONNECTIONS'),
+    # поколения лент (posts.caching) и подписки (posts.follows) меняются
+    # в одном процессе и сразу нужны остальным
+    shared_only=('feed_generation:', 'follows:'),
+)
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+# Допустимое число SQL-запросов на представление (см. MetricsMiddleware).
+# Бюджеты лент включают один запрос миниатюр, если на странице есть
+# картинки (см. posts.cards)
+QUERY_BUDGETS = {
+    'posts:index': 5,
+    'posts:group_list': 6,
+    'posts:profile': 7,
+    # плюс запрос версии поста для ETag (см. posts.conditional)
+    'posts:post_detail': 6,
+    'posts:follow_index': 6,
+}
+# Превышение бюджета бросает QueryBudgetExceeded вместо записи в лог;
+# тесты (TEST_RUNNER) включают это всегда
+QUERY_BUDGETS_STRICT = os.getenv('QUERY_BUDGETS_STRICT', '0') == '1'
+TEST_RUNNER = 'core.runner.TestRunner'
@@ -13,10 +13,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import media_file, static_file
 
 handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.permission_denied'
@@ -27,10 +30,26 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
-    path('about/', include('about.urls', namespace='about'))
+    path('about/', include('about.urls', namespace='about')),
+    path('core/', include('core.urls', namespace='core')),
 ]
 
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+if settings.STATIC_SERVE:
+    # при DEBUG статику из исходных каталогов раньше отдаёт runserver
+    urlpatterns += [
+        re_path(
+            r'^{}(?P<path>.*)$'.format(
+                re.escape(settings.STATIC_URL.lstrip('/'))
+            ),
+            static_file,
+            name='static_file'
+        ),
+    ]
+
+urlpatterns += [
+    re_path(
+        r'^{}(?P<path>.*)$'.format(re.escape(settings.MEDIA_URL.lstrip('/'))),
+        media_file,
+        name='media_file'
+    ),
+]
@@ -7,10 +7,20 @@ For more information on this file, see
 https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 """
 
+import logging
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from core.template import warm_up
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+if settings.TEMPLATE_CACHE:
+    # шаблоны компилируются до первого запроса, а не во время него
+    compiled, errors = warm_up()
+    for name, error in errors.items():
+        logging.getLogger(__name__).error('Шаблон %s: %s', name, error)